@@ -1,126 +1,399 @@
 """bspwm interaction module - handles all bspc commands."""
 
+import json
+import os
+import socket
 import subprocess
 import shutil
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# bspwm prefixes error replies with this byte (see bspwm's common.h)
+FAILURE_MESSAGE = b'\x07'
+
 
 class BspwmError(Exception):
     """Error interacting with bspwm."""
     pass
 
 
-def _check_bspc():
-    """Check if bspc is available."""
-    if not shutil.which('bspc'):
-        raise BspwmError("bspc not found in PATH. Is bspwm installed?")
+_bspc_path = None
 
 
-def run_bspc(args: list, check: bool = True) -> str:
-    """Run a bspc command and return output.
+def _check_bspc() -> str:
+    """Check if bspc is available and return its path (looked up once)."""
+    global _bspc_path
+    if _bspc_path is None:
+        _bspc_path = shutil.which('bspc')
+        if not _bspc_path:
+            raise BspwmError("bspc not found in PATH. Is bspwm installed?")
+    return _bspc_path
 
-    Args:
-        args: Arguments to pass to bspc
-        check: If True, raise on non-zero exit
 
-    Returns:
-        stdout as string (stripped)
+def _socket_path() -> Optional[str]:
+    """Get the bspwm control socket path, resolved the same way bspc does."""
+    path = os.environ.get('BSPWM_SOCKET')
+    if path:
+        return path
+
+    # Default template is /tmp/bspwm<host>_<display>_<screen>-socket
+    display = os.environ.get('DISPLAY')
+    if not display:
+        return None
+    host, _, rest = display.rpartition(':')
+    dn, _, sn = rest.partition('.')
+    try:
+        return f"/tmp/bspwm{host}_{int(dn)}_{int(sn or 0)}-socket"
+    except ValueError:
+        return None
+
+
+class _BspcSession:
+    """Talks to bspwm over its control socket instead of forking bspc.
+
+    bspwm answers exactly one message per connection, so the session
+    caches the socket address and opens a fresh (cheap) connection per
+    command.
     """
-    _check_bspc()
 
-    cmd = ['bspc'] + args
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self, timeout: Optional[float] = None) -> socket.socket:
+        """Open a connection to bspwm. Raises OSError if unreachable."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def write(self, sock: socket.socket, args: list):
+        """Send one command frame (NUL-terminated arguments)."""
+        sock.sendall(('\0'.join(args) + '\0').encode())
+
+    def read(self, sock: socket.socket) -> tuple:
+        """Read a reply until bspwm closes the connection.
+
+        Returns:
+            (ok, reply) tuple of raw bytes; reply is the error message
+            when not ok
+        """
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        reply = b''.join(chunks)
+        if reply[:1] == FAILURE_MESSAGE:
+            return False, reply[1:]
+        return True, reply
+
+    def send(self, sock: socket.socket, args: list) -> tuple:
+        """Send one command and read the reply (closes the socket)."""
+        with sock:
+            self.write(sock, args)
+            return self.read(sock)
+
+
+_session = None
+
+
+def _get_session() -> Optional[_BspcSession]:
+    """Get the shared bspwm socket session (None if no socket is known)."""
+    global _session
+    if _session is None:
+        path = _socket_path()
+        if path:
+            _session = _BspcSession(path)
+    return _session
+
+
+def _run_bspc_process(args: list, check: bool, timeout: Optional[float]) -> str:
+    """Run a bspc command by spawning the bspc binary."""
+    cmd = [_check_bspc()] + args
     try:
+        # Absolute path + close_fds=False lets subprocess use posix_spawn
+        # (our own fds are non-inheritable by default anyway)
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
-            timeout=10
+            close_fds=False,
+            timeout=timeout
         )
         if check and result.returncode != 0:
-            stderr = result.stderr.strip()
+            stderr = result.stderr.decode(errors='replace').strip()
             raise BspwmError(f"bspc {' '.join(args)} failed: {stderr}")
-        return result.stdout.strip()
+        return result.stdout.decode(errors='replace').strip()
     except subprocess.TimeoutExpired:
         raise BspwmError(f"bspc {' '.join(args)} timed out")
     except FileNotFoundError:
         raise BspwmError("bspc not found")
 
 
-def desktop_exists(name: str) -> bool:
+def run_bspc(args: list, check: bool = True, timeout: Optional[float] = 10) -> str:
+    """Run a bspc command and return output.
+
+    Commands go straight to the bspwm socket; the bspc binary is only
+    used when the socket can't be reached.
+
+    Args:
+        args: Arguments to pass to bspc
+        check: If True, raise on non-zero exit
+        timeout: Seconds to wait for bspwm, or None to block (for quick
+            read-only queries, where a watchdog only adds overhead)
+
+    Returns:
+        stdout as string (stripped)
+    """
+    session = _get_session()
+    if session is None:
+        return _run_bspc_process(args, check, timeout)
+
+    try:
+        sock = session.connect(timeout)
+    except OSError:
+        return _run_bspc_process(args, check, timeout)
+
+    try:
+        ok, reply = session.send(sock, args)
+    except OSError as e:
+        raise BspwmError(f"bspc {' '.join(args)} failed: {e}")
+
+    if ok:
+        return reply.strip().decode(errors='replace')
+    if check:
+        stderr = reply.strip().decode(errors='replace')
+        raise BspwmError(f"bspc {' '.join(args)} failed: {stderr}")
+    return ''
+
+
+def run_bspc_batch(commands: list, check: bool = True):
+    """Run a sequence of bspc commands.
+
+    bspwm takes a single command per message, so multi-window operations
+    should build a command list and hand it here rather than looping over
+    run_bspc at the call site. Over the socket, all frames are written
+    before any reply is read: bspwm serves connections in arrival order,
+    so it runs the whole batch back to back. Every command is attempted
+    even if an earlier one fails.
+
+    Args:
+        commands: List of argument lists, one per bspc command
+        check: If True, raise (after the batch) for the first failure
+    """
+    session = _get_session()
+    sent = []
+    try:
+        if session is not None:
+            for args in commands:
+                try:
+                    sock = session.connect(10)
+                except OSError:
+                    break
+                sent.append(sock)
+                session.write(sock, args)
+
+        first_error = None
+        for args, sock in zip(commands, sent):
+            ok, reply = session.read(sock)
+            if not ok and check and first_error is None:
+                stderr = reply.strip().decode(errors='replace')
+                first_error = f"bspc {' '.join(args)} failed: {stderr}"
+    except OSError as e:
+        raise BspwmError(f"bspc batch failed: {e}")
+    finally:
+        for sock in sent:
+            sock.close()
+
+    # Whatever couldn't go over the socket takes the regular path
+    for args in commands[len(sent):]:
+        run_bspc(args, check=check)
+
+    if first_error is not None:
+        raise BspwmError(first_error)
+
+
+def snapshot() -> dict:
+    """Dump the whole bspwm state (monitors, desktops, node trees) at once.
+
+    The result can be passed as `snap` to the query helpers below so that
+    several questions are answered from a single bspwm round-trip.
+    """
+    try:
+        dump = run_bspc(['wm', '-d'], timeout=None)
+        return orjson.loads(dump) if orjson is not None else json.loads(dump)
+    except ValueError as e:
+        raise BspwmError(f"bspc wm -d returned invalid JSON: {e}")
+
+
+def _iter_desktops(snap: dict):
+    """Yield (monitor, desktop) pairs from a snapshot."""
+    for mon in snap.get('monitors', []):
+        for desk in mon.get('desktops', []):
+            yield mon, desk
+
+
+def _find_desktop(snap: dict, name: str) -> Optional[dict]:
+    """Find a desktop by name in a snapshot (first match, like bspc)."""
+    for _, desk in _iter_desktops(snap):
+        if desk['name'] == name:
+            return desk
+    return None
+
+
+def _is_taskwm_client(client: dict) -> bool:
+    """Check a snapshot client's WM_CLASS for taskwm (picker or bar)."""
+    return ('taskwm' in client.get('className', '').lower()
+            or 'taskwm' in client.get('instanceName', '').lower())
+
+
+def _tree_windows(node: Optional[dict], out: list, exclude_taskwm: bool = False) -> list:
+    """Collect window IDs from a node tree in bspwm's query order."""
+    if node is None:
+        return out
+    client = node.get('client')
+    if client is not None and not (exclude_taskwm and _is_taskwm_client(client)):
+        out.append(f"0x{node['id']:08X}")
+    _tree_windows(node.get('firstChild'), out, exclude_taskwm)
+    _tree_windows(node.get('secondChild'), out, exclude_taskwm)
+    return out
+
+
+def desktop_exists(name: str, snap: Optional[dict] = None) -> bool:
     """Check if a desktop with the given name exists."""
+    if snap is not None:
+        return _find_desktop(snap, name) is not None
     try:
-        desktops = run_bspc(['query', '-D', '--names'])
-        return name in desktops.split('\n')
+        desktops = run_bspc(['query', '-D', '--names'], timeout=None)
+        # Whole-line match without splitting out a list of every name
+        return f"\n{name}\n" in f"\n{desktops}\n"
     except BspwmError:
         return False
 
 
-def get_desktops(monitor: Optional[str] = None) -> list:
+def get_desktops(monitor: Optional[str] = None, snap: Optional[dict] = None) -> list:
     """Get list of desktop names, optionally filtered by monitor."""
+    if snap is not None:
+        return [desk['name'] for mon, desk in _iter_desktops(snap)
+                if not monitor or mon['name'] == monitor]
     args = ['query', '-D', '--names']
     if monitor:
         args.extend(['-m', monitor])
     try:
-        output = run_bspc(args)
+        output = run_bspc(args, timeout=None)
         return [d for d in output.split('\n') if d]
     except BspwmError:
         return []
 
 
-def get_monitors() -> list:
+def get_monitors(snap: Optional[dict] = None) -> list:
     """Get list of monitor names."""
+    if snap is not None:
+        return [mon['name'] for mon in snap.get('monitors', [])]
     try:
-        output = run_bspc(['query', '-M', '--names'])
+        output = run_bspc(['query', '-M', '--names'], timeout=None)
         return [m for m in output.split('\n') if m]
     except BspwmError:
         return []
 
 
-def get_focused_monitor() -> str:
+def get_focused_monitor(snap: Optional[dict] = None) -> str:
     """Get the currently focused monitor name."""
-    return run_bspc(['query', '-M', '-m', 'focused', '--names'])
+    if snap is not None:
+        for mon in snap.get('monitors', []):
+            if mon['id'] == snap.get('focusedMonitorId'):
+                return mon['name']
+        raise BspwmError("No focused monitor in bspwm state")
+    return run_bspc(['query', '-M', '-m', 'focused', '--names'], timeout=None)
 
 
 def get_focused_desktop() -> str:
     """Get the currently focused desktop name."""
-    return run_bspc(['query', '-D', '-d', 'focused', '--names'])
+    return run_bspc(['query', '-D', '-d', 'focused', '--names'], timeout=None)
 
 
-def monitor_of_desktop(desktop: str) -> Optional[str]:
+def monitor_of_desktop(desktop: str, snap: Optional[dict] = None) -> Optional[str]:
     """Get the monitor that contains the given desktop."""
+    if snap is not None:
+        for mon, desk in _iter_desktops(snap):
+            if desk['name'] == desktop:
+                return mon['name']
+        return None
     try:
-        return run_bspc(['query', '-M', '-d', desktop, '--names'])
+        return run_bspc(['query', '-M', '-d', desktop, '--names'], timeout=None)
     except BspwmError:
         return None
 
 
+# Desktop names known to exist, loaded on first use and kept up to date by
+# our own add/remove calls. Long-lived processes call forget_desktops()
+# when bspwm reports desktop changes made elsewhere.
+_known_desktops = None
+
+
+def forget_desktops():
+    """Drop the cached set of known desktop names."""
+    global _known_desktops
+    _known_desktops = None
+
+
 def ensure_desktop(monitor: str, name: str):
     """Ensure a desktop exists on the given monitor."""
-    if not desktop_exists(name):
+    global _known_desktops
+    if _known_desktops is None:
+        _known_desktops = set(get_desktops())
+    if name not in _known_desktops:
         run_bspc(['monitor', monitor, '-a', name])
+        _known_desktops.add(name)
+
 
+def ensure_desktops(monitor: str, names: list, snap: Optional[dict] = None):
+    """Ensure multiple desktops exist on the given monitor.
 
-def ensure_desktops(monitor: str, names: list):
-    """Ensure multiple desktops exist on the given monitor."""
-    existing = set(get_desktops(monitor))
-    for name in names:
-        if name not in existing:
-            run_bspc(['monitor', monitor, '-a', name])
+    Only the missing ones are created, in a single batch.
+    """
+    global _known_desktops
+    existing = set(get_desktops(monitor, snap))
+    missing = [name for name in names if name not in existing]
+
+    if missing:
+        run_bspc_batch([['monitor', monitor, '-a', name] for name in missing])
+
+    if snap is not None:
+        _known_desktops = set(get_desktops(snap=snap)).union(missing)
+    elif _known_desktops is not None:
+        _known_desktops.update(missing)
 
 
 def remove_desktop(name: str) -> bool:
     """Remove a desktop. Returns True if successful."""
     try:
         run_bspc(['desktop', name, '-r'])
+        if _known_desktops is not None:
+            _known_desktops.discard(name)
         return True
     except BspwmError:
         return False
 
 
-def list_windows(desktop: str) -> list:
-    """List window IDs on a desktop."""
+def list_windows(desktop: str, snap: Optional[dict] = None,
+                 exclude_taskwm: bool = False) -> list:
+    """List window IDs on a desktop, optionally leaving out taskwm's own."""
+    if snap is not None:
+        desk = _find_desktop(snap, desktop)
+        return _tree_windows(desk['root'], [], exclude_taskwm) if desk else []
+    if exclude_taskwm:
+        return [w for w in list_windows(desktop) if not _is_taskwm_window(w)]
     try:
-        output = run_bspc(['query', '-N', '-d', desktop, '-n', '.window'])
+        output = run_bspc(['query', '-N', '-d', desktop, '-n', '.window'], timeout=None)
         return [w for w in output.split('\n') if w]
     except BspwmError:
         return []
@@ -131,6 +404,16 @@ def move_window(window_id: str, desktop: str):
     run_bspc(['node', window_id, '-d', desktop])
 
 
+def place_window(window_id: str, desktop: str, state: str):
+    """Move a window to a desktop and set its state in one bspc message."""
+    run_bspc(['node', window_id, '-d', desktop, '-t', state])
+
+
+def move_windows(window_ids: list, desktop: str):
+    """Move several windows to a desktop."""
+    run_bspc_batch([['node', win, '-d', desktop] for win in window_ids])
+
+
 def close_window(window_id: str):
     """Close a window gracefully."""
     run_bspc(['node', window_id, '-c'])
@@ -152,7 +435,7 @@ def get_config(key: str, monitor: Optional[str] = None) -> str:
     if monitor:
         args.extend(['-m', monitor])
     args.append(key)
-    return run_bspc(args)
+    return run_bspc(args, timeout=None)
 
 
 def set_config(key: str, value, monitor: Optional[str] = None):
@@ -180,18 +463,53 @@ def set_window_layer(window_id: str, layer: str):
     run_bspc(['node', window_id, '-l', layer])
 
 
+class _SocketSubscription:
+    """An event subscription read straight from the bspwm socket.
+
+    Stands in for the `bspc subscribe` Popen: events are read from
+    stdout's file descriptor, terminate() ends the stream (waking a
+    blocked reader with EOF) and wait() releases the socket.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.stdout = sock
+
+    def terminate(self):
+        try:
+            self.stdout.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def wait(self):
+        self.stdout.close()
+
+
 def subscribe(events: list):
-    """Subscribe to bspwm events. Returns a Popen object.
+    """Subscribe to bspwm events. Returns a Popen-like object.
 
-    Caller should read from proc.stdout line by line.
+    Caller should read raw event lines (bytes) from proc.stdout, and stop
+    with terminate() followed by wait(). The subscription goes over the
+    bspwm socket when it's reachable, otherwise through `bspc subscribe`.
     """
-    _check_bspc()
-    cmd = ['bspc', 'subscribe'] + events
+    session = _get_session()
+    if session is not None:
+        try:
+            sock = session.connect()
+        except OSError:
+            pass
+        else:
+            try:
+                session.write(sock, ['subscribe'] + events)
+            except OSError:
+                sock.close()
+            else:
+                return _SocketSubscription(sock)
+
+    cmd = [_check_bspc(), 'subscribe'] + events
     return subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
+        stderr=subprocess.DEVNULL
     )
 
 
@@ -208,22 +526,71 @@ def ensure_task_desktop(monitor: str, task_id: int):
     ensure_desktop(monitor, task_desktop_name(task_id))
 
 
+def ensure_task_desktops(monitor: str, task_ids: list):
+    """Ensure the desktops for several tasks exist.
+
+    Only the missing ones are created, in a single batch.
+    """
+    global _known_desktops
+    if _known_desktops is None:
+        _known_desktops = set(get_desktops())
+    missing = [name for name in map(task_desktop_name, task_ids)
+               if name not in _known_desktops]
+    if missing:
+        run_bspc_batch([['monitor', monitor, '-a', name] for name in missing])
+        _known_desktops.update(missing)
+
+
 def remove_task_desktop(task_id: int) -> bool:
     """Remove a task desktop if it exists and is empty."""
     name = task_desktop_name(task_id)
-    if not desktop_exists(name):
+    try:
+        snap = snapshot()
+    except BspwmError:
+        snap = None
+
+    if not desktop_exists(name, snap):
         return True
 
     # Check if empty
-    windows = list_windows(name)
+    windows = list_windows(name, snap)
     if windows:
         return False
 
     return remove_desktop(name)
 
 
+_xdisplay = None
+# Xlib.X.AnyPropertyType, spelled out so lookups don't import Xlib.X per call
+_X_ANY_PROPERTY_TYPE = 0
+
+
+def _get_xdisplay():
+    """Get a shared python-xlib display connection (None if unavailable)."""
+    global _xdisplay
+    if _xdisplay is None:
+        try:
+            # Xlib.threaded must come first: the picker looks up its own
+            # window from pywebview's shown-handler thread
+            import Xlib.threaded  # noqa: F401
+            from Xlib import display
+            _xdisplay = display.Display()
+        except Exception:
+            _xdisplay = False
+    return _xdisplay or None
+
+
 def _is_taskwm_window(window_id: str) -> bool:
     """Check if a window belongs to taskwm (picker or bar)."""
+    xdisplay = _get_xdisplay()
+    if xdisplay is not None:
+        try:
+            window = xdisplay.create_resource_object('window', int(window_id, 16))
+            wm_class = window.get_wm_class() or ()
+            return any('taskwm' in c.lower() for c in wm_class)
+        except Exception:
+            return False
+
     try:
         result = subprocess.run(
             ['xprop', '-id', window_id, 'WM_CLASS'],
@@ -237,45 +604,129 @@ def _is_taskwm_window(window_id: str) -> bool:
     return False
 
 
-def swap_task_windows(monitor: str, old_task_id: Optional[int], new_task_id: Optional[int]):
+def _x_window_name(xdisplay, window) -> str:
+    """Read a window title (_NET_WM_NAME, falling back to WM_NAME)."""
+    prop = window.get_full_property(
+        xdisplay.intern_atom('_NET_WM_NAME'), xdisplay.intern_atom('UTF8_STRING'))
+    if prop is not None:
+        value = prop.value
+        return value.decode(errors='replace') if isinstance(value, bytes) else str(value)
+    name = window.get_wm_name()
+    if isinstance(name, bytes):
+        return name.decode('latin-1')
+    return name or ''
+
+
+def find_window_by_name(name: str, pid: Optional[int] = None) -> Optional[str]:
+    """Find a managed window whose title contains `name`.
+
+    Reads _NET_CLIENT_LIST over the shared python-xlib connection when
+    available, otherwise asks xdotool.
+
+    Args:
+        name: Substring of the window title
+        pid: If set, only match windows whose _NET_WM_PID is this process
+
+    Returns:
+        Window ID as a hex string, or None if not found
+    """
+    xdisplay = _get_xdisplay()
+    if xdisplay is not None:
+        try:
+            root = xdisplay.screen().root
+            clients = root.get_full_property(
+                xdisplay.intern_atom('_NET_CLIENT_LIST'), _X_ANY_PROPERTY_TYPE)
+            pid_atom = xdisplay.intern_atom('_NET_WM_PID') if pid is not None else None
+            for wid in (clients.value if clients is not None else []):
+                window = xdisplay.create_resource_object('window', wid)
+                if pid_atom is not None:
+                    prop = window.get_full_property(pid_atom, _X_ANY_PROPERTY_TYPE)
+                    if prop is None or len(prop.value) == 0 or prop.value[0] != pid:
+                        continue
+                if name in _x_window_name(xdisplay, window):
+                    return hex(wid)
+            return None
+        except Exception:
+            return None
+
+    cmd = ['xdotool', 'search', '--name', name]
+    if pid is not None:
+        # --limit stops the search at the first hit
+        cmd[2:2] = ['--all', '--limit', '1', '--pid', str(pid)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
+        # Only the first ID is needed; don't split the rest of the output
+        first, _, _ = result.stdout.lstrip().partition('\n')
+        if result.returncode == 0 and first.strip():
+            return hex(int(first))
+    except Exception:
+        pass
+    return None
+
+
+def swap_task_windows(monitor: str, old_task_id: Optional[int], new_task_id: Optional[int],
+                      focus: Optional[str] = None):
     """Swap windows between active desktop and task desktops.
 
     1. Move windows from 'active' to old task desktop (if old_task_id)
     2. Move windows from new task desktop to 'active' (if new_task_id)
+    3. Focus the `focus` desktop (if given), in the same batch
     """
+    old_desktop = task_desktop_name(old_task_id) if old_task_id is not None else None
+    new_desktop = task_desktop_name(new_task_id) if new_task_id is not None else None
+    if old_desktop == new_desktop:
+        # Re-selecting the current task: keep active as is, only pull strays in
+        old_desktop = None
+
+    # Answer all existence/window questions from one state dump
+    snap = snapshot()
+
     # Ensure desktops exist
-    ensure_desktop(monitor, 'active')
-    if old_task_id is not None:
-        ensure_task_desktop(monitor, old_task_id)
-    if new_task_id is not None:
-        ensure_task_desktop(monitor, new_task_id)
+    global _known_desktops
+    existing = set(get_desktops(snap=snap))
+    missing = [name for name in ('active', old_desktop, new_desktop)
+               if name is not None and name not in existing]
+    commands = [['monitor', monitor, '-a', name] for name in missing]
+    _known_desktops = existing.union(missing)
 
     # Move current windows from active to old task (skip taskwm windows)
-    if old_task_id is not None:
-        old_desktop = task_desktop_name(old_task_id)
-        for win in list_windows('active'):
-            if not _is_taskwm_window(win):
-                move_window(win, old_desktop)
+    if old_desktop is not None:
+        for win in list_windows('active', snap, exclude_taskwm=True):
+            commands.append(['node', win, '-d', old_desktop])
 
     # Move windows from new task to active (skip taskwm windows)
-    if new_task_id is not None:
-        new_desktop = task_desktop_name(new_task_id)
-        for win in list_windows(new_desktop):
-            if not _is_taskwm_window(win):
-                move_window(win, 'active')
+    if new_desktop is not None:
+        for win in list_windows(new_desktop, snap, exclude_taskwm=True):
+            commands.append(['node', win, '-d', 'active'])
+
+    if focus is not None:
+        commands.append(['desktop', '-f', focus])
+
+    run_bspc_batch(commands)
 
 
-def close_all_windows(desktop: str, force: bool = False):
+def close_all_windows(desktop: str, force: bool = False, snap: Optional[dict] = None):
     """Close all windows on a desktop.
 
     Always uses graceful close (-c) to avoid killing entire process trees
     (e.g., terminator runs one process for all windows).
     """
-    windows = list_windows(desktop)
-    for win in windows:
-        close_window(win)  # Always graceful, never kill
+    windows = list_windows(desktop, snap)
+    # Always graceful, never kill
+    run_bspc_batch([['node', win, '-c'] for win in windows])
 
 
-def get_window_count(desktop: str) -> int:
+def get_window_count(desktop: str, snap: Optional[dict] = None) -> int:
     """Get the number of windows on a desktop."""
-    return len(list_windows(desktop))
+    return len(list_windows(desktop, snap))
+
+
+def get_window_counts(snap: Optional[dict] = None) -> dict:
+    """Get window counts for every desktop, keyed by desktop name."""
+    if snap is None:
+        snap = snapshot()
+    counts = {}
+    for _, desk in _iter_desktops(snap):
+        if desk['name'] not in counts:  # First match, like bspc
+            counts[desk['name']] = len(_tree_windows(desk['root'], []))
+    return counts
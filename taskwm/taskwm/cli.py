@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
 """CLI entrypoint for taskwm - the 'tw' command."""
 
-import argparse
 import sys
-
-from . import state, bspwm, config
+import types
 
 
 def cmd_add(args):
     """Add a new task."""
+    from . import state
+
     title = ' '.join(args.title) if isinstance(args.title, list) else args.title
     if not title.strip():
         print("Error: Task title cannot be empty", file=sys.stderr)
@@ -26,6 +26,8 @@ def cmd_add(args):
 
 def cmd_list(args):
     """List tasks."""
+    from . import state
+
     s = state.get_state()
     tasks = s.list_tasks(include_done=args.all if hasattr(args, 'all') else False)
 
@@ -38,6 +40,8 @@ def cmd_list(args):
 
 def cmd_select(args):
     """Select a task (swap windows into active)."""
+    from . import state, bspwm, config
+
     s = state.get_state()
     cfg = config.get_config()
 
@@ -79,6 +83,8 @@ def cmd_select(args):
 
 def cmd_done(args):
     """Mark current task as done/close."""
+    from . import state, bspwm, config
+
     s = state.get_state()
     cfg = config.get_config()
 
@@ -99,36 +105,36 @@ def cmd_done(args):
         print(f"Error: {window_count} window(s) in active. Use -f to force close.", file=sys.stderr)
         return 1
 
-    monitor = s.get_setting('monitor') or cfg.monitor
-    if not monitor:
-        monitor = bspwm.get_focused_monitor()
-
     try:
+        # Resolve the monitor up front so a bspwm failure here can't leave
+        # the task closed without a successor selected
+        monitor = s.get_setting('monitor') or cfg.monitor
+        if not monitor:
+            monitor = bspwm.get_focused_monitor()
+
         # Close windows
         if window_count > 0:
             bspwm.close_all_windows('active', force=args.force)
 
-        # Handle task based on close policy
-        if cfg.close_policy == "archive":
-            s.mark_done(task_id)
-        else:
-            s.remove_task(task_id)
-
         # Remove task desktop
         bspwm.remove_task_desktop(task_id)
 
         # Auto-select next non-blocked task if available
-        remaining_tasks = s.list_tasks(include_done=False)
-        available_tasks = [t for t in remaining_tasks if not t.get('blocked', False)]
-        if available_tasks:
-            next_task = available_tasks[0]
-            next_task_id = next_task['id']
+        next_task = s.first_unblocked_task(skip_id=task_id)
+        next_task_id = next_task['id'] if next_task else None
+        if next_task_id is not None:
             # Swap windows from next task to active
             bspwm.swap_task_windows(monitor, None, next_task_id)
+
+        # The state only changes, in one journal write, once bspwm succeeded
+        # (and the journal lock is never held across bspwm calls)
+        with s.batch():
+            # Handle task based on close policy
+            if cfg.close_policy == "archive":
+                s.mark_done(task_id)
+            else:
+                s.remove_task(task_id)
             s.set_current_task_id(next_task_id)
-        else:
-            # No non-blocked tasks left
-            s.set_current_task_id(None)
 
         return 0
     except bspwm.BspwmError as e:
@@ -138,6 +144,8 @@ def cmd_done(args):
 
 def cmd_remove(args):
     """Remove a task."""
+    from . import state, bspwm
+
     s = state.get_state()
 
     try:
@@ -155,12 +163,17 @@ def cmd_remove(args):
     current_id = s.get_current_task_id()
     desktop_name = bspwm.task_desktop_name(task_id)
 
-    # Check for windows
+    # Check for windows (one state dump answers both questions)
+    try:
+        snap = bspwm.snapshot()
+    except bspwm.BspwmError:
+        snap = None
+
     window_count = 0
     if current_id == task_id:
-        window_count = bspwm.get_window_count('active')
-    elif bspwm.desktop_exists(desktop_name):
-        window_count = bspwm.get_window_count(desktop_name)
+        window_count = bspwm.get_window_count('active', snap)
+    elif bspwm.desktop_exists(desktop_name, snap):
+        window_count = bspwm.get_window_count(desktop_name, snap)
 
     if window_count > 0 and not args.force:
         print(f"Error: Task has {window_count} window(s). Use -f to force remove.", file=sys.stderr)
@@ -188,6 +201,8 @@ def cmd_remove(args):
 
 def cmd_current(args):
     """Print current task ID."""
+    from . import state
+
     s = state.get_state()
     task_id = s.get_current_task_id()
     if task_id is not None:
@@ -197,6 +212,8 @@ def cmd_current(args):
 
 def cmd_title(args):
     """Print current task title."""
+    from . import state
+
     s = state.get_state()
     title = s.get_current_title()
     print(title)
@@ -259,15 +276,22 @@ def cmd_ui(args):
 
 def cmd_status(args):
     """Output status for polybar (task title or empty)."""
-    s = state.get_state()
-    task = s.get_current_task()
+    from . import state
 
-    if not task:
+    # Fast path: the title mirrored by the last state write
+    try:
+        with open(state.STATUS_FILE) as f:
+            title = f.read()
+    except OSError:
+        task = state.get_state().get_current_task()
+        title = task['title'] if task else ''
+
+    if not title:
         # No active task
         return 0
 
-    title = task['title']
-    max_len = args.max_length if hasattr(args, 'max_length') and args.max_length else 50
+    # Both the fast path and argparse always set max_length
+    max_len = args.max_length or 50
 
     if len(title) > max_len:
         title = title[:max_len - 3] + "..."
@@ -276,8 +300,10 @@ def cmd_status(args):
     return 0
 
 
-def cmd_next(args):
-    """Select next task in list (skips blocked tasks)."""
+def _cycle_task(args, step: int):
+    """Select the task `step` positions away from the current one (wraps)."""
+    from . import state, bspwm, config
+
     s = state.get_state()
     cfg = config.get_config()
 
@@ -294,17 +320,16 @@ def cmd_next(args):
     current_id = s.get_current_task_id()
 
     # Find current index
-    current_idx = -1
-    for i, t in enumerate(tasks):
-        if t['id'] == current_id:
-            current_idx = i
-            break
+    task_ids = [t['id'] for t in tasks]
+    try:
+        current_idx = task_ids.index(current_id)
+    except ValueError:
+        # Not in the list: next starts from the first task, prev from the last
+        current_idx = -1 if step > 0 else 0
 
-    # Get next task (wrap around)
-    next_idx = (current_idx + 1) % len(tasks)
-    next_task = tasks[next_idx]
+    target_id = task_ids[(current_idx + step) % len(task_ids)]
 
-    if next_task['id'] == current_id:
+    if target_id == current_id:
         # Only one task
         return 0
 
@@ -313,61 +338,65 @@ def cmd_next(args):
         monitor = bspwm.get_focused_monitor()
 
     try:
-        bspwm.swap_task_windows(monitor, current_id, next_task['id'])
-        s.set_current_task_id(next_task['id'])
+        bspwm.swap_task_windows(monitor, current_id, target_id)
+        s.set_current_task_id(target_id)
         return 0
     except bspwm.BspwmError as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
 
-def cmd_prev(args):
-    """Select previous task in list (skips blocked tasks)."""
-    s = state.get_state()
-    cfg = config.get_config()
-
-    all_tasks = s.list_tasks(include_done=False)
-    # Filter out blocked tasks
-    tasks = [t for t in all_tasks if not t.get('blocked', False)]
-    # If -p flag, only include prepared tasks
-    if hasattr(args, 'prepared') and args.prepared:
-        tasks = [t for t in tasks if t.get('prepared', False)]
-    if not tasks:
-        print("Error: No available tasks", file=sys.stderr)
-        return 1
-
-    current_id = s.get_current_task_id()
-
-    # Find current index
-    current_idx = 0
-    for i, t in enumerate(tasks):
-        if t['id'] == current_id:
-            current_idx = i
-            break
-
-    # Get previous task (wrap around)
-    prev_idx = (current_idx - 1) % len(tasks)
-    prev_task = tasks[prev_idx]
-
-    if prev_task['id'] == current_id:
-        # Only one task
-        return 0
+def cmd_next(args):
+    """Select next task in list (skips blocked tasks)."""
+    return _cycle_task(args, 1)
 
-    monitor = s.get_setting('monitor') or cfg.monitor
-    if not monitor:
-        monitor = bspwm.get_focused_monitor()
 
-    try:
-        bspwm.swap_task_windows(monitor, current_id, prev_task['id'])
-        s.set_current_task_id(prev_task['id'])
-        return 0
-    except bspwm.BspwmError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        return 1
+def cmd_prev(args):
+    """Select previous task in list (skips blocked tasks)."""
+    return _cycle_task(args, -1)
+
+
+def _fast_dispatch(argv: list):
+    """Run the polled read-only commands without building the parser.
+
+    Handles `cur`, `title` and `status [-l N]`; returns None for anything
+    else (including malformed options) so argparse can take over.
+    """
+    if not argv:
+        return None
+    command, rest = argv[0], argv[1:]
+
+    if command == 'cur' and not rest:
+        return cmd_current(None)
+    if command == 'title' and not rest:
+        return cmd_title(None)
+    if command != 'status':
+        return None
+
+    max_length = 50
+    if len(rest) == 2 and rest[0] in ('-l', '--max-length'):
+        value = rest[1]
+    elif len(rest) == 1 and rest[0].startswith('--max-length='):
+        value = rest[0].partition('=')[2]
+    elif rest:
+        return None
+    else:
+        value = None
+    if value is not None:
+        if not (value.isascii() and value.isdigit()):  # int() rejects e.g. "²"
+            return None
+        max_length = int(value)
+    return cmd_status(types.SimpleNamespace(max_length=max_length))
 
 
 def main():
     """Main CLI entrypoint."""
+    result = _fast_dispatch(sys.argv[1:])
+    if result is not None:
+        return result
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog='tw',
         description='taskwm - Task-Centric Workspaces for bspwm'
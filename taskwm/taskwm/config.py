@@ -28,84 +28,142 @@ DEFAULT_CONFIG = {
 }
 
 
+# Theme keys the picker applies, and the CSS custom properties they set
+THEME_CSS_VARS = {
+    "bg": "--bg",
+    "fg": "--fg",
+    "accent": "--accent",
+    "button_bg": "--button-bg",
+    "entry_bg": "--entry-bg",
+    "select_bg": "--select-bg",
+    "border": "--border",
+}
+
+
+def _clone_defaults() -> dict:
+    """Return a fresh copy of DEFAULT_CONFIG (dicts are copied, not shared)."""
+    return {k: v.copy() if isinstance(v, dict) else v for k, v in DEFAULT_CONFIG.items()}
+
+
+# Marks a dot-path that doesn't resolve in the loaded config
+_MISSING = object()
+
+
+def _section_property(section: str, key: str, default: Any, doc: str) -> property:
+    """Build a Config property reading a fixed '<section>.<key>' value."""
+    def getter(self):
+        values = self.load().get(section)
+        if isinstance(values, dict):
+            return values.get(key, default)
+        return default
+    return property(getter, doc=doc)
+
+
 class Config:
     """Handles configuration loading with defaults."""
 
     def __init__(self, config_file: Path = CONFIG_FILE):
         self.config_file = config_file
         self._data = None
+        self._lookups = {}
+        self._theme_css = None
 
     def _ensure_dir(self):
         """Ensure config directory exists."""
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
 
-    def _deep_merge(self, base: dict, override: dict) -> dict:
-        """Deep merge override into base."""
-        result = base.copy()
+    def _deep_merge_inplace(self, base: dict, override: dict) -> dict:
+        """Merge override into base, modifying and returning base.
+
+        DEFAULT_CONFIG is only two levels deep (sections like 'theme' hold
+        plain values), so a section-level update() is a full deep merge.
+        """
         for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
+            section = base.get(key)
+            if isinstance(section, dict) and isinstance(value, dict):
+                section.update(value)
             else:
-                result[key] = value
-        return result
+                base[key] = value
+        return base
 
     def load(self) -> dict:
         """Load config from file, merging with defaults."""
         if self._data is not None:
             return self._data
 
-        self._ensure_dir()
-
         # Start with defaults
-        self._data = json.loads(json.dumps(DEFAULT_CONFIG))  # Deep copy
+        self._data = _clone_defaults()
 
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    user_config = json.load(f)
-                self._data = self._deep_merge(self._data, user_config)
-            except (json.JSONDecodeError, IOError):
-                pass  # Use defaults on error
+        try:
+            with open(self.config_file, 'r') as f:
+                user_config = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return self._data  # Missing or unreadable: use defaults
 
+        if isinstance(user_config, dict):
+            self._data = self._deep_merge_inplace(self._data, user_config)
         return self._data
 
     def reload(self):
         """Force reload from disk."""
         self._data = None
+        self._lookups = {}
+        self._theme_css = None
         return self.load()
 
     def get(self, key: str, default: Any = None) -> Any:
-        """Get a config value by dot-notation key (e.g., 'theme.bg')."""
-        data = self.load()
-        keys = key.split('.')
-        value = data
-        for k in keys:
+        """Get a config value by dot-notation key (e.g., 'theme.bg').
+
+        Resolved paths are memoized until reload().
+        """
+        try:
+            value = self._lookups[key]
+        except KeyError:
+            value = self._lookups[key] = self._resolve(key)
+        return default if value is _MISSING else value
+
+    def _resolve(self, key: str) -> Any:
+        """Walk the loaded config along a dot-path (_MISSING if absent)."""
+        value = self.load()
+        for k in key.split('.'):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
-                return default
+                return _MISSING
         return value
 
-    # Convenience properties
+    # Convenience properties (direct lookups, no dot-path walk)
     @property
     def monitor(self) -> str:
         """Get configured monitor (may be None for auto-detect)."""
-        return self.get('monitor')
+        return self.load().get('monitor')
 
     @property
     def theme(self) -> dict:
         """Get theme configuration."""
-        return self.get('theme', DEFAULT_CONFIG['theme'])
-
-    @property
-    def close_policy(self) -> str:
-        """Get close policy ('archive' or 'delete')."""
-        return self.get('behavior.close_policy', 'delete')
+        return self.load().get('theme', DEFAULT_CONFIG['theme'])
 
     @property
-    def move_stray_to(self) -> str:
-        """Get where to move stray windows on tasks desktop."""
-        return self.get('behavior.move_stray_on_tasks_to', 'active')
+    def theme_css(self) -> dict:
+        """Get the theme as CSS custom properties (resolved once per load)."""
+        if self._theme_css is None:
+            theme = self.theme
+            if not isinstance(theme, dict):
+                theme = {}
+            self._theme_css = {
+                var: theme[key] for key, var in THEME_CSS_VARS.items() if theme.get(key)
+            }
+        return self._theme_css
+
+    close_policy = _section_property(
+        'behavior', 'close_policy', 'delete',
+        "Get close policy ('archive' or 'delete')."
+    )
+
+    move_stray_to = _section_property(
+        'behavior', 'move_stray_on_tasks_to', 'active',
+        "Get where to move stray windows on tasks desktop."
+    )
 
 
 # Singleton instance
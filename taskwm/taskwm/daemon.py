@@ -3,11 +3,7 @@
 
 import os
 import sys
-import signal
-import subprocess
-import threading
 import time
-import secrets
 from pathlib import Path
 
 from . import bspwm, state, config
@@ -21,6 +17,32 @@ TOKEN_FILE = RUNTIME_DIR / "token"
 TASKS_DESKTOP = "tasks"
 ACTIVE_DESKTOP = "active"
 LEGACY_DESKTOPS = ["0", "3", "4", "5", "6", "7", "8", "9"]
+REQUIRED_DESKTOPS = (TASKS_DESKTOP, ACTIVE_DESKTOP, *LEGACY_DESKTOPS)
+
+# Subscribed events that only invalidate cached desktop/monitor info
+DESKTOP_EVENTS = frozenset((b'desktop_add', b'desktop_remove', b'desktop_rename'))
+MONITOR_EVENTS = frozenset((b'monitor_add', b'monitor_remove', b'monitor_rename'))
+
+
+def _write_runtime_file(path: Path, text: str):
+    """Atomically write a small owner-only (0600) file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, text.encode())
+    finally:
+        os.close(fd)
+    os.rename(tmp_path, path)
+
+
+def _normalize_window_id(wid) -> int:
+    """Convert window ID string to int for comparison."""
+    if not wid:
+        return 0
+    if isinstance(wid, int):
+        return wid
+    # Base 0 takes both bspwm's "0x..." and xdotool's decimal IDs in one call
+    return int(wid, 0)
 
 
 class Daemon:
@@ -31,40 +53,29 @@ class Daemon:
         self.st = state.get_state()
         self.monitor = None
         self.picker_proc = None
+        self._picker_log_fd = None
         self.event_proc = None
         self.running = False
         self.picker_window_id = None
+        self._tasks_desktop_id = None
+        self._wakeup_fd = None  # Read end of the signal wakeup pipe
 
     def setup(self):
         """Initial setup - determine monitor, ensure desktops."""
-        # Determine target monitor
-        self.monitor = self.cfg.monitor
-
-        # Validate configured monitor exists
-        available_monitors = bspwm.get_monitors()
-        if not available_monitors:
-            raise RuntimeError("No monitors found")
-
-        if self.monitor and self.monitor not in available_monitors:
-            print(f"[daemon] Configured monitor '{self.monitor}' not found, auto-detecting...", file=sys.stderr)
-            self.monitor = None
-
-        if not self.monitor:
-            try:
-                self.monitor = bspwm.get_focused_monitor()
-            except bspwm.BspwmError:
-                self.monitor = available_monitors[0]
+        # One state dump answers the monitor and desktop questions below
+        try:
+            snap = bspwm.snapshot()
+        except bspwm.BspwmError:
+            snap = None
 
-        # Save monitor to state
-        self.st.set_setting('monitor', self.monitor)
+        self.choose_monitor(snap)
 
         # Ensure required desktops exist
-        required = [TASKS_DESKTOP, ACTIVE_DESKTOP] + LEGACY_DESKTOPS
-        bspwm.ensure_desktops(self.monitor, required)
+        bspwm.ensure_desktops(self.monitor, REQUIRED_DESKTOPS, snap)
+        self.get_tasks_desktop_id()
 
         # Also ensure task desktops for existing tasks
-        for task in self.st.list_tasks():
-            bspwm.ensure_task_desktop(self.monitor, task['id'])
+        bspwm.ensure_task_desktops(self.monitor, [t['id'] for t in self.st.list_tasks()])
 
         # Remove default "Desktop" desktop if it exists (bspwm creates it on startup)
         bspwm.remove_desktop("Desktop")
@@ -79,6 +90,8 @@ class Daemon:
 
     def start_picker(self):
         """Start the picker UI process."""
+        import subprocess
+
         if self.picker_proc and self.picker_proc.poll() is None:
             return  # Already running
 
@@ -91,21 +104,23 @@ class Daemon:
         taskwm_root = Path(__file__).parent.parent
         env['PYTHONPATH'] = str(taskwm_root) + ':' + env.get('PYTHONPATH', '')
 
-        # Log picker output to file for debugging
-        log_file = RUNTIME_DIR / "picker.log"
-        log_handle = open(log_file, 'w')
+        # Log picker output to file for debugging (one fd shared by restarts)
+        if self._picker_log_fd is None:
+            self._picker_log_fd = os.open(
+                RUNTIME_DIR / "picker.log",
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND,
+                0o600
+            )
 
         self.picker_proc = subprocess.Popen(
             [sys.executable, '-m', 'taskwm.ui_picker'],
             env=env,
-            stdout=log_handle,
-            stderr=log_handle
+            stdout=self._picker_log_fd,
+            stderr=self._picker_log_fd
         )
-        self._picker_log = log_handle  # Keep reference to prevent closing
 
-        # Save PID
-        RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
-        PICKER_PID_FILE.write_text(str(self.picker_proc.pid))
+        # Save PID (RUNTIME_DIR was created in run())
+        _write_runtime_file(PICKER_PID_FILE, str(self.picker_proc.pid))
 
         print(f"[daemon] Started picker (PID {self.picker_proc.pid})", file=sys.stderr)
 
@@ -115,101 +130,197 @@ class Daemon:
             print("[daemon] Picker process died, restarting...", file=sys.stderr)
             self.start_picker()
 
+    def get_tasks_desktop_id(self) -> str:
+        """Get the tasks desktop's bspwm ID (cached until desktops change)."""
+        if not self._tasks_desktop_id:
+            self._tasks_desktop_id = bspwm.run_bspc(
+                ['query', '-D', '-d', TASKS_DESKTOP], check=False, timeout=None)
+        return self._tasks_desktop_id
+
     def get_picker_window_id(self):
-        """Try to find the picker window ID by window name."""
-        try:
-            result = subprocess.run(
-                ['xdotool', 'search', '--name', 'taskwm - Tasks'],
-                capture_output=True, text=True, timeout=2
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                dec_id = int(result.stdout.strip().split('\n')[0])
-                return hex(dec_id)
-        except Exception:
-            pass
-        return None
+        """Try to find the picker window ID by window name.
 
-    def _normalize_window_id(self, wid: str) -> int:
-        """Convert window ID string to int for comparison."""
-        if wid is None:
-            return 0
-        if isinstance(wid, int):
-            return wid
-        return int(wid, 16) if wid.startswith('0x') else int(wid)
+        Only the running picker process's window matches, so a window
+        left over from a picker that is being replaced isn't picked up.
+        """
+        pid = self.picker_proc.pid if self.picker_proc else None
+        return bspwm.find_window_by_name('taskwm - Tasks', pid=pid)
 
     def enforce_tasks_desktop(self, event_window_id=None):
         """Ensure only picker window is on tasks desktop."""
-        windows = bspwm.list_windows(TASKS_DESKTOP)
+        # WM_CLASS comes with the state dump, so taskwm's own windows are
+        # filtered out without asking the X server per window
+        try:
+            windows = bspwm.list_windows(TASKS_DESKTOP, bspwm.snapshot(), exclude_taskwm=True)
+        except bspwm.BspwmError:
+            windows = bspwm.list_windows(TASKS_DESKTOP, exclude_taskwm=True)
 
         if not self.picker_window_id:
             self.picker_window_id = self.get_picker_window_id()
 
-        picker_id_int = self._normalize_window_id(self.picker_window_id)
+        # Windows that belong on the tasks desktop
+        skip_ids = {_normalize_window_id(self.picker_window_id)}
+        skip_ids.discard(0)
+
+        strays = [win for win in windows if _normalize_window_id(win) not in skip_ids]
+        if not strays:
+            return
 
-        for win in windows:
-            win_int = self._normalize_window_id(win)
-            # Skip if it matches picker window ID
-            if picker_id_int and win_int == picker_id_int:
-                continue
+        target = self.cfg.move_stray_to
+        if target == "last":
+            target = ACTIVE_DESKTOP
 
-            # Also skip if it's a taskwm window (by WM_CLASS)
-            if bspwm._is_taskwm_window(win):
-                continue
+        try:
+            bspwm.move_windows(strays, target)
+            print(f"[daemon] Moved stray window(s) {', '.join(strays)} from tasks to {target}", file=sys.stderr)
+        except bspwm.BspwmError as e:
+            print(f"[daemon] Failed to move stray window(s): {e}", file=sys.stderr)
+
+    def _read_event_lines(self, proc):
+        """Yield raw event lines from a bspwm subscription (see bspwm.subscribe).
+
+        Reads the pipe non-blocking through a selector and splits lines out
+        of a byte buffer, skipping text-mode decoding and readline calls.
+        The signal wakeup pipe is watched too, so child exits are handled
+        here between events.
+        """
+        import selectors
+
+        fd = proc.stdout.fileno()
+        os.set_blocking(fd, False)
+        buf = bytearray()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            if self._wakeup_fd is not None:
+                sel.register(self._wakeup_fd, selectors.EVENT_READ)
+            while self.running:
+                ready = {key.fd for key, _ in sel.select()}
+                if self._wakeup_fd in ready:
+                    self._drain_wakeup()
+                    self.check_children()
+                if fd not in ready:
+                    continue
+                try:
+                    chunk = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    return  # bspc exited
+                buf += chunk
+                end = buf.rfind(b'\n')
+                if end < 0:
+                    continue
+                lines = bytes(buf[:end]).split(b'\n')
+                del buf[:end + 1]
+                yield from lines
+
+    def _drain_wakeup(self):
+        """Empty the signal wakeup pipe."""
+        try:
+            while os.read(self._wakeup_fd, 512):
+                pass
+        except BlockingIOError:
+            pass
 
-            target = self.cfg.move_stray_to
-            if target == "last":
-                target = ACTIVE_DESKTOP
+    def choose_monitor(self, snap=None):
+        """Pick the target monitor and cache it in state for the CLI/picker."""
+        # Determine target monitor
+        monitor = self.cfg.monitor
 
+        # Validate configured monitor exists
+        available_monitors = bspwm.get_monitors(snap)
+        if not available_monitors:
+            raise RuntimeError("No monitors found")
+
+        if monitor and monitor not in available_monitors:
+            print(f"[daemon] Configured monitor '{monitor}' not found, auto-detecting...", file=sys.stderr)
+            monitor = None
+
+        if not monitor:
             try:
-                bspwm.move_window(win, ACTIVE_DESKTOP)
-                print(f"[daemon] Moved stray window {win} from tasks to active", file=sys.stderr)
-            except bspwm.BspwmError as e:
-                print(f"[daemon] Failed to move window {win}: {e}", file=sys.stderr)
+                monitor = bspwm.get_focused_monitor(snap)
+            except bspwm.BspwmError:
+                monitor = available_monitors[0]
+
+        self.monitor = monitor
+
+        # Save monitor to state
+        if self.st.get_setting('monitor') != monitor:
+            self.st.set_setting('monitor', monitor)
+
+    def on_monitors_changed(self):
+        """Re-pick the monitor if ours went away or the configured one appeared."""
+        snap = bspwm.snapshot()
+        monitors = bspwm.get_monitors(snap)
+        configured = self.cfg.monitor
+        if self.monitor not in monitors or (configured in monitors and configured != self.monitor):
+            self.choose_monitor(snap)
+            # The new monitor may lack our desktops, and the cached desktop
+            # names/IDs describe the old layout
+            bspwm.forget_desktops()
+            self._tasks_desktop_id = None
+            bspwm.ensure_desktops(self.monitor, REQUIRED_DESKTOPS, snap)
+            print(f"[daemon] Monitor changed, now using: {self.monitor}", file=sys.stderr)
+
+    def check_children(self):
+        """Restart the picker if it exited (called after SIGCHLD)."""
+        # SIGCHLD also fires for bspc/xdotool helpers; only the picker
+        # matters here (never reap other children, subprocess owns them)
+        if self.picker_proc and self.picker_proc.poll() is not None:
+            self.check_ui_processes()
+            # New window; enforce_tasks_desktop looks it up on demand
+            self.picker_window_id = None
 
     def event_loop(self):
         """Main event loop - subscribe to bspwm events."""
-        events = ['node_add', 'node_transfer']
+        events = ['node_add', 'node_transfer', 'desktop_add', 'desktop_remove', 'desktop_rename',
+                  'monitor_add', 'monitor_remove', 'monitor_rename']
 
         while self.running:
             try:
                 self.event_proc = bspwm.subscribe(events)
 
-                for line in self.event_proc.stdout:
+                for line in self._read_event_lines(self.event_proc):
                     if not self.running:
                         break
 
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    parts = line.split()
-                    if not parts:
-                        continue
+                    # Split once and dispatch on the event name instead of
+                    # probing each prefix in turn
+                    parts = line.split(b' ')
+                    event = parts[0]
 
-                    event_type = parts[0]
-
-                    if event_type == 'node_add':
+                    if event == b'node_add':
                         # node_add <monitor_id> <desktop_id> <ip_id> <node_id>
                         if len(parts) >= 3:
-                            desktop_id = parts[2]
+                            desktop_id = parts[2].decode()
                             try:
-                                tasks_id = bspwm.run_bspc(['query', '-D', '-d', TASKS_DESKTOP], check=False)
-                                if desktop_id == tasks_id.strip():
+                                if desktop_id == self.get_tasks_desktop_id():
                                     self.enforce_tasks_desktop()
                             except Exception:
                                 pass
 
-                    elif event_type == 'node_transfer':
+                    elif event == b'node_transfer':
                         # node_transfer <src_mon> <src_desk> <src_node> <dst_mon> <dst_desk> <dst_node>
                         if len(parts) >= 6:
-                            dst_desktop_id = parts[5]
+                            dst_desktop_id = parts[5].decode()
                             try:
-                                tasks_id = bspwm.run_bspc(['query', '-D', '-d', TASKS_DESKTOP], check=False)
-                                if dst_desktop_id == tasks_id.strip():
+                                if dst_desktop_id == self.get_tasks_desktop_id():
                                     self.enforce_tasks_desktop()
                             except Exception:
                                 pass
 
+                    elif event in DESKTOP_EVENTS:
+                        # Desktop set changed; cached names/IDs may be stale
+                        bspwm.forget_desktops()
+                        self._tasks_desktop_id = None
+
+                    elif event in MONITOR_EVENTS:
+                        # The cached target monitor may be gone
+                        try:
+                            self.on_monitors_changed()
+                        except Exception as e:
+                            print(f"[daemon] Failed to update monitor: {e}", file=sys.stderr)
+
             except Exception as e:
                 print(f"[daemon] Event loop error: {e}", file=sys.stderr)
                 if self.running:
@@ -218,17 +329,20 @@ class Daemon:
             finally:
                 if self.event_proc:
                     self.event_proc.terminate()
+                    self.event_proc.wait()
                     self.event_proc = None
 
     def run(self):
         """Main daemon run method."""
+        import secrets
+        import signal
+
         RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
-        PID_FILE.write_text(str(os.getpid()))
+        _write_runtime_file(PID_FILE, str(os.getpid()))
 
         # Generate and save auth token
         self.token = secrets.token_hex(32)
-        TOKEN_FILE.write_text(self.token)
-        os.chmod(TOKEN_FILE, 0o600)  # Only owner can read
+        _write_runtime_file(TOKEN_FILE, self.token)  # Only owner can read
 
         def cleanup(signum, frame):
             print("\n[daemon] Shutting down...", file=sys.stderr)
@@ -251,6 +365,14 @@ class Daemon:
         signal.signal(signal.SIGTERM, cleanup)
         signal.signal(signal.SIGINT, cleanup)
 
+        # Signals write a byte to this pipe; the event loop's selector
+        # watches it, so SIGCHLD is handled on the main thread
+        self._wakeup_fd, wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_fd, False)
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w, warn_on_full_buffer=False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
         try:
             self.setup()
         except Exception as e:
@@ -273,33 +395,21 @@ class Daemon:
 
         self.running = True
 
-        event_thread = threading.Thread(target=self.event_loop, daemon=True)
-        event_thread.start()
-
         print("[daemon] Running...", file=sys.stderr)
-        while self.running:
-            time.sleep(5)
-
-            picker_restarted = self.picker_proc and self.picker_proc.poll() is not None
-            self.check_ui_processes()
-
-            if picker_restarted or not self.picker_window_id:
-                new_id = self.get_picker_window_id()
-                if new_id:
-                    self.picker_window_id = new_id
+        self.event_loop()
 
         return 0
 
 
 def is_daemon_running() -> bool:
     """Check if daemon is already running."""
-    if not PID_FILE.exists():
-        return False
-
     try:
-        pid = int(PID_FILE.read_text().strip())
+        with open(PID_FILE, 'rb') as f:
+            pid = int(f.read())
         os.kill(pid, 0)
         return True
+    except FileNotFoundError:
+        return False
     except (ValueError, ProcessLookupError, PermissionError):
         try:
             PID_FILE.unlink()
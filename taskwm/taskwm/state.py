@@ -1,15 +1,41 @@
-"""State management for taskwm - handles task persistence."""
+"""State management for taskwm - handles task persistence.
 
+State lives in state.json (a full snapshot) plus state.journal (one JSON
+op per line, appended on every mutation). Readers replay the journal over
+the snapshot; compaction folds it back in. Appends and compaction are
+serialized with flock on the journal, so the daemon, picker and CLI can
+all write concurrently.
+"""
+
+import fcntl
 import json
 import os
 import tempfile
 import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 STATE_DIR = Path.home() / ".local" / "state" / "taskwm"
 STATE_FILE = STATE_DIR / "state.json"
 
+# Mutations are appended here as one-line JSON ops and folded into
+# state.json once the journal grows past JOURNAL_COMPACT_SIZE
+JOURNAL_COMPACT_SIZE = 64 * 1024
+
+# state.json is written compact; set TASKWM_PRETTY_STATE=1 to indent it
+PRETTY_STATE = os.environ.get("TASKWM_PRETTY_STATE") == "1"
+
+# Current task title, mirrored on every save so `tw status` can print it
+# without loading the state file
+_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR")
+STATUS_FILE = (Path(_RUNTIME_DIR) / "taskwm" if _RUNTIME_DIR else STATE_DIR) / "status"
+
 DEFAULT_STATE = {
     "version": 1,
     "current_task_id": None,
@@ -23,133 +49,582 @@ DEFAULT_STATE = {
 }
 
 
+# Journal ops. Each takes the loaded state dict, its id -> task index and an
+# op dict, applies the change in place (keeping the index in sync) and
+# returns True if anything changed. The same functions serve live mutations
+# and journal replay in load().
+
+
+def _op_add_task(data: dict, index: dict, op: dict) -> bool:
+    task = op["task"]
+    data["tasks"].append(task)
+    index[task["id"]] = task
+    data["next_id"] = max(data["next_id"], task["id"] + 1)
+    return True
+
+
+def _op_remove_task(data: dict, index: dict, op: dict) -> bool:
+    task_id = op["id"]
+    if index.pop(task_id, None) is None:
+        return False
+    data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
+    # Clear current_task_id if we removed the active task
+    if data["current_task_id"] == task_id:
+        data["current_task_id"] = None
+    return True
+
+
+def _op_mark_done(data: dict, index: dict, op: dict) -> bool:
+    task = index.get(op["id"])
+    if task is None:
+        return False
+    task["done"] = True
+    task["done_at"] = op["t"]
+    if data["current_task_id"] == op["id"]:
+        data["current_task_id"] = None
+    return True
+
+
+def _op_update_task(data: dict, index: dict, op: dict) -> bool:
+    task = index.get(op["id"])
+    if task is None:
+        return False
+    task.update(op["fields"])
+    return True
+
+
+def _op_move_task(data: dict, index: dict, op: dict) -> bool:
+    if op["id"] not in index:
+        return False
+    tasks = data["tasks"]
+    for i, task in enumerate(tasks):
+        if task["id"] == op["id"]:
+            j = i + op["by"]
+            if not 0 <= j < len(tasks):
+                return False
+            tasks[i], tasks[j] = tasks[j], tasks[i]
+            return True
+    return False
+
+
+def _op_reorder_task(data: dict, index: dict, op: dict) -> bool:
+    if op["id"] not in index:
+        return False
+    tasks = data["tasks"]
+    for i, task in enumerate(tasks):
+        if task["id"] == op["id"]:
+            new_index = max(0, min(op["index"], len(tasks) - 1))
+            tasks.insert(new_index, tasks.pop(i))
+            return True
+    return False
+
+
+def _op_set_current(data: dict, index: dict, op: dict) -> bool:
+    data["current_task_id"] = op["id"]
+    return True
+
+
+def _op_set_setting(data: dict, index: dict, op: dict) -> bool:
+    data.setdefault("settings_cache", {})[op["key"]] = op["value"]
+    return True
+
+
+def _op_add_category(data: dict, index: dict, op: dict) -> bool:
+    settings = data.setdefault("settings_cache", {})
+    category = op["category"]
+    settings.setdefault("categories", []).append(category)
+    settings["next_category_id"] = max(settings.get("next_category_id", 1), category["id"] + 1)
+    return True
+
+
+def _op_update_category(data: dict, index: dict, op: dict) -> bool:
+    for cat in data.get("settings_cache", {}).get("categories", []):
+        if cat["id"] == op["id"]:
+            cat["name"] = op["name"]
+            cat["color"] = op["color"]
+            return True
+    return False
+
+
+def _op_remove_category(data: dict, index: dict, op: dict) -> bool:
+    category_id = op["id"]
+    categories = data.get("settings_cache", {}).get("categories", [])
+    remaining = [c for c in categories if c["id"] != category_id]
+    if len(remaining) == len(categories):
+        return False
+    data["settings_cache"]["categories"] = remaining
+    # Clear category from tasks that had it (scan in a comprehension,
+    # write only the matches)
+    for task in [t for t in data["tasks"] if t.get("category") == category_id]:
+        task["category"] = None
+    return True
+
+
+_OPS = {
+    "add_task": _op_add_task,
+    "remove_task": _op_remove_task,
+    "mark_done": _op_mark_done,
+    "update_task": _op_update_task,
+    "move_task": _op_move_task,
+    "reorder_task": _op_reorder_task,
+    "set_current": _op_set_current,
+    "set_setting": _op_set_setting,
+    "add_category": _op_add_category,
+    "update_category": _op_update_category,
+    "remove_category": _op_remove_category,
+}
+
+
+# No-op checks: ops that would leave the state unchanged are reported as
+# successful without being applied or journaled
+
+_UNSET = object()
+
+
+def _noop_update_task(data: dict, index: dict, op: dict) -> bool:
+    task = index.get(op["id"])
+    return task is not None and all(task.get(k, _UNSET) == v for k, v in op["fields"].items())
+
+
+def _noop_set_current(data: dict, index: dict, op: dict) -> bool:
+    return data.get("current_task_id") == op["id"]
+
+
+def _noop_set_setting(data: dict, index: dict, op: dict) -> bool:
+    return data.get("settings_cache", {}).get(op["key"], _UNSET) == op["value"]
+
+
+# Ops that can change which tasks are active or their order
+_LIST_OPS = {"add_task", "remove_task", "mark_done", "move_task", "reorder_task"}
+
+_NOOPS = {
+    "update_task": _noop_update_task,
+    "set_current": _noop_set_current,
+    "set_setting": _noop_set_setting,
+}
+
+
+# compact() bumps "journal_gen" in the snapshot and starts the emptied journal
+# with a matching header line. A journal whose generation doesn't match was
+# already folded in by a compaction that died before truncating it.
+_GEN_PREFIX = b'{"journal_gen":'
+_GEN_HEADER = _GEN_PREFIX + b'%d}\n'
+
+
+def _journal_gen(journal: bytes) -> Optional[int]:
+    """Generation from the journal's header line (0 if it has none)."""
+    if not journal.startswith(_GEN_PREFIX):
+        return 0
+    try:
+        return _loads(journal.partition(b'\n')[0])["journal_gen"]
+    except (ValueError, KeyError, TypeError):
+        return None  # Torn header
+
+
+def _loads(raw: bytes):
+    """Parse JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Built once: json.dumps() with non-default options constructs a new
+# encoder per call, which dominates for small journal ops
+_COMPACT_ENCODER = json.JSONEncoder(separators=(',', ':'))
+_PRETTY_ENCODER = json.JSONEncoder(indent=2)
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    encoder = _PRETTY_ENCODER if indent else _COMPACT_ENCODER
+    return encoder.encode(obj).encode()
+
+
+def _stat_key(st: Optional[os.stat_result]) -> Optional[tuple]:
+    """Identity of a file version: (inode, mtime, size)."""
+    if st is None:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _stat_path(path: Path) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _default_state() -> dict:
+    data = DEFAULT_STATE.copy()
+    data["tasks"] = []
+    data["settings_cache"] = DEFAULT_STATE["settings_cache"].copy()
+    return data
+
+
 class State:
-    """Manages taskwm state with atomic file operations."""
+    """Manages taskwm state with atomic file operations.
 
-    def __init__(self, state_file: Path = STATE_FILE):
+    Mutations are appended to a journal next to the state file and
+    replayed on load; compact() folds the journal back into the snapshot.
+    """
+
+    def __init__(self, state_file: Path = STATE_FILE, status_file: Optional[Path] = None):
         self.state_file = state_file
+        self.journal_file = state_file.with_suffix(".journal")
+        self.status_file = status_file
         self._data = None
+        self._index = None  # id -> task dict for self._data
+        self._active = None  # Cached list_tasks(include_done=False)
+        self._disk_key = None  # (state.json, journal) versions self._data reflects
+        self._pending = []  # Journal lines held back by batch()
+        self._journal_handle = None
+        self._batch_depth = 0
+        self._dir_ready = False
 
     def _ensure_dir(self):
-        """Ensure state directory exists."""
-        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        """Ensure state directory exists (checked once per instance)."""
+        if not self._dir_ready:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
 
     def load(self) -> dict:
-        """Load state from file, creating default if missing."""
+        """Load state from file plus journal, creating default if missing."""
         if self._data is not None:
             return self._data
 
-        self._ensure_dir()
+        # Files are stat'ed before they are read, so a concurrent write can
+        # only make the key look stale (forcing a re-read), never fresh
+        try:
+            journal = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            state_key = _stat_key(_stat_path(self.state_file))
+            self._set_data(self._read_snapshot())
+            self._disk_key = (state_key, None)
+            return self._data
 
+        with journal:
+            # Shared lock: compact() must not swap the snapshot and truncate
+            # the journal between our two reads
+            fcntl.flock(journal, fcntl.LOCK_SH)
+            state_key = _stat_key(_stat_path(self.state_file))
+            journal_key = _stat_key(os.fstat(journal.fileno()))
+            self._set_data(self._read_snapshot())
+            if not self._replay_unfolded(journal.read()):
+                journal_key = None  # Next writer resets it; resync fully then
+            self._disk_key = (state_key, journal_key)
+        return self._data
+
+    def _set_data(self, data: dict):
+        """Install freshly read state and index its tasks by ID."""
+        self._data = data
+        self._active = None
+        self._index = index = {}
+        for task in data["tasks"]:
+            index[task["id"]] = task
+            task.setdefault("done", False)  # Lets list_tasks skip .get()
+
+    def _read_snapshot(self) -> dict:
+        """Read state.json, creating default if missing."""
         if not self.state_file.exists():
-            self._data = DEFAULT_STATE.copy()
-            self._data["tasks"] = []
-            self._data["settings_cache"] = DEFAULT_STATE["settings_cache"].copy()
+            self._set_data(_default_state())
             self.save()
             return self._data
 
         try:
-            with open(self.state_file, 'r') as f:
-                self._data = json.load(f)
-            return self._data
-        except (json.JSONDecodeError, IOError):
-            self._data = DEFAULT_STATE.copy()
-            self._data["tasks"] = []
-            self._data["settings_cache"] = DEFAULT_STATE["settings_cache"].copy()
-            return self._data
+            with open(self.state_file, 'rb') as f:
+                return _loads(f.read())
+        except (ValueError, IOError):
+            return _default_state()
+
+    def _replay(self, journal: bytes):
+        """Apply journaled ops to the loaded state."""
+        for line in journal.splitlines():
+            try:
+                op = _loads(line)
+                _OPS[op["op"]](self._data, self._index, op)
+            except (ValueError, KeyError, TypeError, IndexError):
+                continue  # Torn or unknown line
+
+    def _replay_unfolded(self, journal: bytes) -> bool:
+        """Replay a whole journal unless the snapshot already includes it.
+
+        Returns False (replaying nothing) for a stale journal.
+        """
+        if _journal_gen(journal) != self._data.get("journal_gen", 0):
+            return False
+        self._replay(journal)
+        return True
+
+    def _reset_journal(self, journal):
+        """Empty the locked journal, leaving just the snapshot's generation header."""
+        journal.truncate(0)
+        journal.write(_GEN_HEADER % self._data.get("journal_gen", 0))
+        journal.flush()
 
     def save(self):
-        """Save state atomically (write to temp, then rename)."""
+        """Save a full snapshot atomically (write to temp, then rename).
+
+        The very first snapshot has no previous file to protect, so it is
+        created in place instead.
+        """
         self._ensure_dir()
 
         if self._data is None:
             return
 
+        payload = _dumps(self._data, indent=PRETTY_STATE)
+        try:
+            fd = os.open(self.state_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            self._replace_snapshot(payload)
+        else:
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception:
+                os.unlink(self.state_file)
+                raise
+            self._sync_dir()
+
+        self._write_status()
+
+    def _replace_snapshot(self, payload: bytes):
+        """Replace state.json via a temp file and rename."""
         fd, tmp_path = tempfile.mkstemp(dir=self.state_file.parent, suffix='.tmp')
         try:
-            with os.fdopen(fd, 'w') as f:
-                json.dump(self._data, f, indent=2)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                # Data must be on disk before the rename can be
+                f.flush()
+                os.fsync(f.fileno())
             os.rename(tmp_path, self.state_file)
         except Exception:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
             raise
+        self._sync_dir()
+
+    def _sync_dir(self):
+        """fsync the state directory so a new or renamed state.json is durable."""
+        dir_fd = os.open(self.state_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def compact(self):
+        """Fold the journal into state.json and empty it."""
+        self._ensure_dir()
+        with open(self.journal_file, 'a+b') as journal:
+            fcntl.flock(journal, fcntl.LOCK_EX)
+            # Other processes may have appended ops we haven't seen
+            journal.seek(0)
+            self._set_data(self._read_snapshot())
+            self._replay_unfolded(journal.read())
+            self._data["journal_gen"] = self._data.get("journal_gen", 0) + 1
+            self.save()
+            self._reset_journal(journal)
+            self._disk_key = (_stat_key(_stat_path(self.state_file)),
+                              _stat_key(os.fstat(journal.fileno())))
+
+    def _commit(self, op: dict) -> bool:
+        """Apply an op to the loaded state and journal it if it changed anything."""
+        noop = _NOOPS.get(op["op"])
+        with self.batch():
+            # Checked only now: another process may have changed what the
+            # op would be a no-op against
+            if noop is not None and noop(self._data, self._index, op):
+                return True
+            if not _OPS[op["op"]](self._data, self._index, op):
+                return False
+            if op["op"] in _LIST_OPS:
+                self._active = None
+            self._pending.append(_dumps(op) + b'\n')
+        return True
+
+    @contextmanager
+    def batch(self):
+        """Group mutations into one locked read-modify-write.
+
+        The journal stays locked for the whole batch and the loaded state is
+        first caught up with whatever other processes journaled, so IDs and
+        lookups made inside it are current. Journal lines are written once,
+        on exit.
+        """
+        if self._batch_depth == 0:
+            self._sync(self._lock_journal())
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush()
+
+    def _sync(self, journal):
+        """Catch the loaded state up with disk (caller holds the journal lock)."""
+        state_key = _stat_key(_stat_path(self.state_file))
+        journal_key = _stat_key(os.fstat(journal.fileno()))
+        old = self._disk_key
+        if self._data is not None and old == (state_key, journal_key):
+            return
+
+        with open(self.journal_file, 'rb') as f:
+            if (self._data is not None and old[0] == state_key and old[1] is not None
+                    and old[1][0] == journal_key[0] and old[1][2] <= journal_key[2]):
+                # Only appended to since we loaded: replay just the new lines
+                f.seek(old[1][2])
+                self._active = None
+                self._replay(f.read())
+            else:
+                self._set_data(self._read_snapshot())
+                if not self._replay_unfolded(f.read()):
+                    # Finish the interrupted compaction before appending
+                    self._reset_journal(journal)
+                    journal_key = _stat_key(os.fstat(journal.fileno()))
+        self._disk_key = (state_key, journal_key)
+
+    def _flush(self):
+        """Append pending journal lines in a single write and unlock the journal."""
+        journal = self._journal_handle
+        size = 0
+        try:
+            if self._pending:
+                journal.write(b''.join(self._pending))
+                self._pending.clear()
+                size = journal.tell()
+                # The state was synced under this lock, so it now matches
+                # the journal including our own lines
+                self._disk_key = (self._disk_key[0], _stat_key(os.fstat(journal.fileno())))
+                if size <= JOURNAL_COMPACT_SIZE:
+                    self._write_status()  # compact() writes it otherwise
+        finally:
+            fcntl.flock(journal, fcntl.LOCK_UN)
+
+        if size > JOURNAL_COMPACT_SIZE:
+            self.compact()
+
+    def _lock_journal(self):
+        """Return the append handle for the journal, exclusively locked.
+
+        The handle is kept open across flushes; it is only reopened if the
+        journal file was deleted underneath us (e.g. a state reset).
+        """
+        journal = self._journal_handle
+        if journal is not None:
+            fcntl.flock(journal, fcntl.LOCK_EX)
+            if os.fstat(journal.fileno()).st_nlink > 0:
+                return journal
+            journal.close()  # Also drops the lock
+
+        self._ensure_dir()
+        journal = self._journal_handle = open(self.journal_file, 'ab', buffering=0)
+        fcntl.flock(journal, fcntl.LOCK_EX)
+        return journal
+
+    def _write_status(self):
+        """Mirror the current task title into the status file (if any).
+
+        Called with the journal locked and the state synced, so the title
+        is the current one whichever process wrote last.
+        """
+        if self.status_file is None:
+            return
+
+        title = self.get_current_title()
+        try:
+            with open(self.status_file) as f:
+                if f.read() == title:
+                    return
+        except OSError:
+            pass
+
+        tmp_path = self.status_file.with_name(f"{self.status_file.name}.{os.getpid()}.tmp")
+        try:
+            self.status_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(title)
+            os.rename(tmp_path, self.status_file)
+        except OSError:
+            pass  # Status file is only a cache; tw status falls back to state
 
     def reload(self):
-        """Force reload from disk."""
+        """Reload from disk if state.json or the journal changed."""
+        if self._data is not None:
+            disk_key = (_stat_key(_stat_path(self.state_file)),
+                        _stat_key(_stat_path(self.journal_file)))
+            if disk_key == self._disk_key:
+                return self._data
         self._data = None
         return self.load()
 
+    def version(self) -> tuple:
+        """Reload if needed and return a key that changes with the state on disk."""
+        self.reload()
+        return self._disk_key
+
     # Task CRUD operations
 
     def add_task(self, title: str) -> int:
         """Add a new task and return its ID."""
-        data = self.load()
-
         # Sanitize title (remove newlines)
         title = title.replace('\n', ' ').replace('\r', '').strip()
         if not title:
             raise ValueError("Task title cannot be empty")
 
-        task_id = data["next_id"]
-        data["next_id"] += 1
-
-        task = {
-            "id": task_id,
-            "title": title,
-            "created": int(time.time()),
-            "done": False,
-            "size": "M",
-            "category": None,
-            "prepared": False,
-            "blocked": False
-        }
-        data["tasks"].append(task)
-        self.save()
+        with self.batch():
+            task_id = self._data["next_id"]
+
+            task = {
+                "id": task_id,
+                "title": title,
+                "created": int(time.time()),
+                "done": False,
+                "size": "M",
+                "category": None,
+                "prepared": False,
+                "blocked": False
+            }
+            self._commit({"op": "add_task", "task": task})
 
         return task_id
 
     def list_tasks(self, include_done: bool = False) -> list:
-        """List all tasks (optionally including done tasks)."""
+        """List all tasks (optionally including done tasks).
+
+        The returned list is shared state; callers must not modify it.
+        """
         data = self.load()
         if include_done:
             return data["tasks"]
-        return [t for t in data["tasks"] if not t.get("done", False)]
+        if self._active is None:
+            self._active = [t for t in data["tasks"] if not t["done"]]
+        return self._active
+
+    def first_unblocked_task(self, skip_id: Optional[int] = None) -> Optional[dict]:
+        """Get the first non-done task that isn't blocked (stops at the match).
+
+        Args:
+            skip_id: A task to pass over, e.g. the one being closed
+        """
+        return next((t for t in self.list_tasks()
+                     if not t.get('blocked', False) and t['id'] != skip_id), None)
 
     def get_task(self, task_id: int) -> Optional[dict]:
         """Get a task by ID."""
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                return task
-        return None
+        self.load()
+        return self._index.get(task_id)
 
     def remove_task(self, task_id: int) -> bool:
         """Remove a task by ID. Returns True if found and removed."""
-        data = self.load()
-        original_len = len(data["tasks"])
-        data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
-
-        if len(data["tasks"]) < original_len:
-            # Clear current_task_id if we removed the active task
-            if data["current_task_id"] == task_id:
-                data["current_task_id"] = None
-            self.save()
-            return True
-        return False
+        return self._commit({"op": "remove_task", "id": task_id})
 
     def mark_done(self, task_id: int) -> bool:
         """Mark a task as done. Returns True if found."""
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["done"] = True
-                task["done_at"] = int(time.time())
-                if data["current_task_id"] == task_id:
-                    data["current_task_id"] = None
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "mark_done", "id": task_id, "t": int(time.time())})
 
     def rename_task(self, task_id: int, new_title: str) -> bool:
         """Rename a task. Returns True if found and renamed."""
@@ -157,13 +632,7 @@ class State:
         if not new_title:
             return False
 
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["title"] = new_title
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_task", "id": task_id, "fields": {"title": new_title}})
 
     def set_task_size(self, task_id: int, size: str) -> bool:
         """Set task t-shirt size. Valid sizes: S, M, L."""
@@ -171,43 +640,19 @@ class State:
         if size not in valid_sizes:
             return False
 
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["size"] = size
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_task", "id": task_id, "fields": {"size": size}})
 
     def set_task_category(self, task_id: int, category_id: Optional[int]) -> bool:
         """Set task category. Use None to clear category."""
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["category"] = category_id
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_task", "id": task_id, "fields": {"category": category_id}})
 
     def set_task_prepared(self, task_id: int, prepared: bool) -> bool:
         """Set task prepared state."""
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["prepared"] = prepared
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_task", "id": task_id, "fields": {"prepared": prepared}})
 
     def set_task_blocked(self, task_id: int, blocked: bool) -> bool:
         """Set task blocked state."""
-        data = self.load()
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["blocked"] = blocked
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_task", "id": task_id, "fields": {"blocked": blocked}})
 
     # Category management
 
@@ -221,23 +666,15 @@ class State:
         if not name:
             return None
 
-        data = self.load()
-        if "settings_cache" not in data:
-            data["settings_cache"] = {}
-
-        categories = data["settings_cache"].get("categories", [])
-        next_id = data["settings_cache"].get("next_category_id", 1)
-
-        category = {
-            "id": next_id,
-            "name": name,
-            "color": color
-        }
-        categories.append(category)
+        with self.batch():
+            next_id = self._data.get("settings_cache", {}).get("next_category_id", 1)
 
-        data["settings_cache"]["categories"] = categories
-        data["settings_cache"]["next_category_id"] = next_id + 1
-        self.save()
+            category = {
+                "id": next_id,
+                "name": name,
+                "color": color
+            }
+            self._commit({"op": "add_category", "category": category})
 
         return next_id
 
@@ -247,83 +684,42 @@ class State:
         if not name:
             return False
 
-        data = self.load()
-        categories = data.get("settings_cache", {}).get("categories", [])
-
-        for cat in categories:
-            if cat["id"] == category_id:
-                cat["name"] = name
-                cat["color"] = color
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "update_category", "id": category_id, "name": name, "color": color})
 
     def remove_category(self, category_id: int) -> bool:
         """Remove a category. Clears category from all tasks using it."""
-        data = self.load()
-        categories = data.get("settings_cache", {}).get("categories", [])
-
-        original_len = len(categories)
-        categories = [c for c in categories if c["id"] != category_id]
-
-        if len(categories) < original_len:
-            data["settings_cache"]["categories"] = categories
-            # Clear category from tasks that had it
-            for task in data["tasks"]:
-                if task.get("category") == category_id:
-                    task["category"] = None
-            self.save()
-            return True
-        return False
+        return self._commit({"op": "remove_category", "id": category_id})
 
     def move_task_up(self, task_id: int) -> bool:
         """Move a task up in the list. Returns True if moved."""
-        data = self.load()
-        tasks = data["tasks"]
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id and i > 0:
-                tasks[i], tasks[i-1] = tasks[i-1], tasks[i]
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "move_task", "id": task_id, "by": -1})
 
     def move_task_down(self, task_id: int) -> bool:
         """Move a task down in the list. Returns True if moved."""
-        data = self.load()
-        tasks = data["tasks"]
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id and i < len(tasks) - 1:
-                tasks[i], tasks[i+1] = tasks[i+1], tasks[i]
-                self.save()
-                return True
-        return False
+        return self._commit({"op": "move_task", "id": task_id, "by": 1})
 
     def reorder_task(self, task_id: int, new_index: int) -> bool:
         """Move a task to a specific index. Returns True if moved."""
-        data = self.load()
-        tasks = data["tasks"]
+        with self.batch():
+            tasks = self._data["tasks"]
 
-        # Find current index
-        current_index = None
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id:
-                current_index = i
-                break
+            # Find current index
+            current_index = None
+            for i, task in enumerate(tasks):
+                if task["id"] == task_id:
+                    current_index = i
+                    break
 
-        if current_index is None:
-            return False
+            if current_index is None:
+                return False
 
-        # Clamp new_index to valid range
-        new_index = max(0, min(new_index, len(tasks) - 1))
+            # Clamp new_index to valid range
+            new_index = max(0, min(new_index, len(tasks) - 1))
 
-        if current_index == new_index:
-            return True  # Already at position
+            if current_index == new_index:
+                return True  # Already at position
 
-        # Remove and insert at new position
-        task = tasks.pop(current_index)
-        tasks.insert(new_index, task)
-        self.save()
-        return True
+            return self._commit({"op": "reorder_task", "id": task_id, "index": new_index})
 
     # Current task management
 
@@ -334,16 +730,12 @@ class State:
 
     def set_current_task_id(self, task_id: Optional[int]):
         """Set the currently selected task ID."""
-        data = self.load()
-        data["current_task_id"] = task_id
-        self.save()
+        self._commit({"op": "set_current", "id": task_id})
 
     def get_current_task(self) -> Optional[dict]:
         """Get the currently selected task."""
-        task_id = self.get_current_task_id()
-        if task_id is None:
-            return None
-        return self.get_task(task_id)
+        data = self.load()
+        return self._index.get(data.get("current_task_id"))  # None is never a key
 
     def get_current_title(self) -> str:
         """Get the title of the current task, or empty string."""
@@ -361,11 +753,7 @@ class State:
 
     def set_setting(self, key: str, value):
         """Set a cached setting."""
-        data = self.load()
-        if "settings_cache" not in data:
-            data["settings_cache"] = {}
-        data["settings_cache"][key] = value
-        self.save()
+        self._commit({"op": "set_setting", "key": key, "value": value})
 
 
 # Singleton instance for convenience
@@ -375,5 +763,5 @@ def get_state() -> State:
     """Get the singleton state instance."""
     global _state_instance
     if _state_instance is None:
-        _state_instance = State()
+        _state_instance = State(status_file=STATUS_FILE)
     return _state_instance
@@ -3,6 +3,10 @@
 
 import sys
 import os
+import functools
+import hmac
+import threading
+import time
 from pathlib import Path
 
 from . import state, bspwm, config
@@ -10,6 +14,35 @@ from . import state, bspwm, config
 TASKS_DESKTOP = "tasks"
 ACTIVE_DESKTOP = "active"
 TOKEN_FILE = Path.home() / ".local" / "state" / "taskwm" / "token"
+HTML_FILE = Path(__file__).parent / 'ui' / 'index.html'
+
+# The daemon finds the picker by this title (Daemon.get_picker_window_id)
+WINDOW_TITLE = 'taskwm - Tasks'
+WINDOW_OPTIONS = {
+    'width': 600,
+    'height': 500,
+    'resizable': True,
+    'text_select': False,
+}
+
+# Window lookups in _position_window, backing off from 5ms (~1.3s in total)
+POSITION_ATTEMPTS = 9
+
+# Tells the page to refresh (see _startPolling in ui/index.html)
+CHANGED_JS = "window.dispatchEvent(new Event('taskwm-changed'))"
+
+
+def _locked(method):
+    """Run a PickerAPI method holding the state lock.
+
+    pywebview serves each JS call on its own thread, and State is not
+    thread-safe.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        with self._state_lock:
+            return method(self, *args)
+    return wrapper
 
 
 class PickerAPI:
@@ -19,28 +52,87 @@ class PickerAPI:
         self._token = token
         self._cfg = config.get_config()
         self._st = state.get_state()
+        self._state_lock = threading.Lock()
+        # Serializes window shuffles; taken before _state_lock, never after
+        self._bspwm_lock = threading.Lock()
+        # Per-desktop window counts, dropped whenever bspwm reports a
+        # window/desktop change (see _watch_windows)
+        self._window_counts = None
+        self._counts_lock = threading.Lock()
+        self._counts_gen = 0
+        self._watching = False
+        self._watch_proc = None
+        # Set by TaskPicker: push refreshes to the page instead of fast polling
+        self.live_updates = False
+        self.on_change = None
 
     def _verify_token(self, token: str) -> bool:
-        """Verify the provided token matches."""
-        return token == self._token
+        """Verify the provided token matches (in constant time)."""
+        if not isinstance(token, str):
+            return False
+        return hmac.compare_digest(token.encode(), self._token.encode())
+
+    @_locked
+    def get_version(self) -> str | None:
+        """Get a key that changes whenever tasks or window counts may have.
+
+        The key is '<state>/<window counts>', so the page can tell which
+        of the two to re-read. None means window counts aren't tracked and
+        must always be re-read.
+        """
+        return self._version_key()
+
+    def _version_key(self) -> str | None:
+        """get_version() without taking the lock (callers hold it).
 
+        Reloads the state if it changed on disk, even when returning None.
+        """
+        state_key = self._st.version()
+        if not self._watching:
+            return None
+        return f"{state_key}/{self._counts_gen}"
+
+    @_locked
+    def get_snapshot(self) -> dict:
+        """Get the version, tasks, categories and current task in one call.
+
+        Every JS API call is a round trip over the webview bridge, so the
+        page loads with this instead of a call per piece. Window counts
+        stay separate (get_window_counts) as they wait on bspwm.
+        """
+        version = self._version_key()  # Also reloads the state
+        return {
+            'version': version,
+            'tasks': self._st.list_tasks(include_done=False),
+            'categories': self._st.get_categories(),
+            'current_task_id': self._st.get_current_task_id(),
+        }
+
+    @_locked
     def get_tasks(self) -> list:
         """Get list of non-done tasks."""
         self._st.reload()
         return self._st.list_tasks(include_done=False)
 
+    @_locked
     def get_current_task_id(self) -> int | None:
         """Get the current task ID."""
         self._st.reload()
         return self._st.get_current_task_id()
 
     def get_config(self) -> dict:
-        """Get configuration for theming."""
+        """Get configuration for theming.
+
+        The theme goes out already resolved to CSS custom properties
+        (Config.theme_css); the raw theme dict isn't sent.
+        """
         return {
-            'theme': self._cfg.theme,
-            'monitor': self._cfg.monitor
+            'theme_css': self._cfg.theme_css,
+            'monitor': self._cfg.monitor,
+            'live_updates': self.live_updates
         }
 
+    @_locked
     def add_task(self, title: str) -> int | None:
         """Add a new task, return its ID."""
         title = title.strip()
@@ -54,129 +146,224 @@ class PickerAPI:
 
     def select_task(self, task_id: int) -> bool:
         """Select a task and switch to active desktop."""
-        monitor = self._st.get_setting('monitor')
-        if not monitor:
+        # bspwm runs outside the state lock, so the page's polls aren't
+        # stalled behind the window shuffle
+        with self._bspwm_lock:
+            with self._state_lock:
+                monitor = self._st.get_setting('monitor')
+                old_task_id = self._st.get_current_task_id()
+
             try:
-                monitor = bspwm.get_focused_monitor()
-                self._st.set_setting('monitor', monitor)
+                if not monitor:
+                    monitor = bspwm.get_focused_monitor()
+                    with self._state_lock:
+                        self._st.set_setting('monitor', monitor)
+                bspwm.swap_task_windows(monitor, old_task_id, task_id, focus=ACTIVE_DESKTOP)
             except bspwm.BspwmError:
                 return False
 
-        old_task_id = self._st.get_current_task_id()
-
-        try:
-            bspwm.swap_task_windows(monitor, old_task_id, task_id)
-            self._st.set_current_task_id(task_id)
-            bspwm.focus_desktop(ACTIVE_DESKTOP)
+            with self._state_lock:
+                self._st.set_current_task_id(task_id)
             return True
-        except bspwm.BspwmError:
-            return False
 
     def close_task(self, task_id: int) -> bool:
-        """Close a task, closing its windows."""
-        task = self._st.get_task(task_id)
-        if not task:
-            return False
-
-        current_id = self._st.get_current_task_id()
-
-        try:
-            # Close windows
-            if task_id == current_id:
-                bspwm.close_all_windows(ACTIVE_DESKTOP)
-            else:
-                desktop = bspwm.task_desktop_name(task_id)
-                if bspwm.desktop_exists(desktop):
-                    bspwm.close_all_windows(desktop)
+        """Close a task, closing its windows.
+
+        All bspwm work happens first; the state only changes, in a single
+        journal write, once it succeeded.
+        """
+        with self._bspwm_lock:
+            with self._state_lock:
+                if not self._st.get_task(task_id):
+                    return False
+                current_id = self._st.get_current_task_id()
+                # Closing the current task: auto-select next non-blocked one
+                next_task = None
+                if task_id == current_id:
+                    next_task = self._st.first_unblocked_task(skip_id=task_id)
+                monitor = self._st.get_setting('monitor') or self._cfg.monitor
+            next_id = next_task['id'] if next_task else None
 
-            # Handle based on policy
-            if self._cfg.close_policy == "archive":
-                self._st.mark_done(task_id)
-            else:
-                self._st.remove_task(task_id)
-
-            # Remove desktop
-            bspwm.remove_task_desktop(task_id)
-
-            # If we closed the current task, auto-select next non-blocked one
-            if task_id == current_id:
-                remaining = self._st.list_tasks(include_done=False)
-                # Skip blocked tasks
-                available = [t for t in remaining if not t.get('blocked', False)]
-                if available:
-                    next_task = available[0]
-                    monitor = self._st.get_setting('monitor') or self._cfg.monitor
-                    if monitor:
-                        bspwm.swap_task_windows(monitor, None, next_task['id'])
-                        self._st.set_current_task_id(next_task['id'])
+            try:
+                # Close windows; one tree dump answers both questions
+                if task_id == current_id:
+                    desktop = ACTIVE_DESKTOP
                 else:
-                    self._st.set_current_task_id(None)
+                    desktop = bspwm.task_desktop_name(task_id)
+                snap = bspwm.snapshot()
+                if bspwm.desktop_exists(desktop, snap):
+                    bspwm.close_all_windows(desktop, snap=snap)
+
+                # Remove desktop
+                bspwm.remove_task_desktop(task_id)
+
+                if next_id is not None:
+                    if not monitor:
+                        monitor = bspwm.get_focused_monitor()
+                    bspwm.swap_task_windows(monitor, None, next_id)
+            except bspwm.BspwmError:
+                return False
 
+            with self._state_lock, self._st.batch():
+                # Handle based on policy
+                if self._cfg.close_policy == "archive":
+                    self._st.mark_done(task_id)
+                else:
+                    self._st.remove_task(task_id)
+                if task_id == current_id:
+                    self._st.set_current_task_id(next_id)
             return True
-        except bspwm.BspwmError:
-            return False
 
+    @_locked
     def move_task_up(self, task_id: int) -> bool:
         """Move a task up in the list."""
         return self._st.move_task_up(task_id)
 
+    @_locked
     def move_task_down(self, task_id: int) -> bool:
         """Move a task down in the list."""
         return self._st.move_task_down(task_id)
 
+    @_locked
     def reorder_task(self, task_id: int, new_index: int) -> bool:
         """Move a task to a specific index."""
         return self._st.reorder_task(task_id, new_index)
 
+    @_locked
     def rename_task(self, task_id: int, new_title: str) -> bool:
         """Rename a task."""
         return self._st.rename_task(task_id, new_title)
 
+    @_locked
     def set_task_size(self, task_id: int, size: str) -> bool:
         """Set task t-shirt size (XS, S, M, L, XL)."""
         return self._st.set_task_size(task_id, size)
 
+    @_locked
     def set_task_category(self, task_id: int, category_id: int | None) -> bool:
         """Set task category."""
         return self._st.set_task_category(task_id, category_id)
 
+    @_locked
     def set_task_prepared(self, task_id: int, prepared: bool) -> bool:
         """Set task prepared state."""
         return self._st.set_task_prepared(task_id, prepared)
 
+    @_locked
     def set_task_blocked(self, task_id: int, blocked: bool) -> bool:
         """Set task blocked state."""
         return self._st.set_task_blocked(task_id, blocked)
 
+    @_locked
     def get_categories(self) -> list:
         """Get all categories."""
         self._st.reload()
         return self._st.get_categories()
 
+    @_locked
     def add_category(self, name: str, color: str) -> int | None:
         """Add a new category."""
         return self._st.add_category(name, color)
 
+    @_locked
     def update_category(self, category_id: int, name: str, color: str) -> bool:
         """Update a category."""
         return self._st.update_category(category_id, name, color)
 
+    @_locked
     def remove_category(self, category_id: int) -> bool:
         """Remove a category."""
         return self._st.remove_category(category_id)
 
     def get_window_count(self, task_id: int) -> int:
         """Get window count for a task."""
-        current_id = self._st.get_current_task_id()
+        with self._state_lock:
+            current_id = self._st.get_current_task_id()
 
         if task_id == current_id:
-            return bspwm.get_window_count(ACTIVE_DESKTOP)
+            desktop = ACTIVE_DESKTOP
         else:
             desktop = bspwm.task_desktop_name(task_id)
-            if bspwm.desktop_exists(desktop):
-                return bspwm.get_window_count(desktop)
+
+        try:
+            return self._get_window_counts().get(desktop, 0)
+        except bspwm.BspwmError:
             return 0
 
+    def get_window_counts(self) -> dict:
+        """Get window counts for all non-done tasks, keyed by task ID.
+
+        One call for the whole list instead of one per task.
+        """
+        with self._state_lock:
+            current_id = self._st.get_current_task_id()
+            task_ids = [t['id'] for t in self._st.list_tasks(include_done=False)]
+
+        try:
+            counts = self._get_window_counts()
+        except bspwm.BspwmError:
+            counts = {}
+
+        result = {}
+        for task_id in task_ids:
+            if task_id == current_id:
+                desktop = ACTIVE_DESKTOP
+            else:
+                desktop = bspwm.task_desktop_name(task_id)
+            result[task_id] = counts.get(desktop, 0)
+        return result
+
+    def _get_window_counts(self) -> dict:
+        """Return cached window counts, querying bspwm only after a change."""
+        with self._counts_lock:
+            if self._window_counts is not None:
+                return self._window_counts
+            counts = bspwm.get_window_counts()
+            # Invalidation waits for the lock, so a change during the query
+            # still clears what we store here
+            if self._watching:
+                self._window_counts = counts
+            return counts
+
+    def start_window_watch(self):
+        """Watch bspwm events in the background to invalidate window counts."""
+        self._watching = True
+        threading.Thread(target=self._watch_windows, daemon=True).start()
+
+    def _watch_windows(self):
+        """Drop cached window counts on every bspwm node/desktop event."""
+        events = ['node_add', 'node_remove', 'node_transfer', 'node_swap',
+                  'desktop_add', 'desktop_remove', 'desktop_rename']
+        try:
+            proc = self._watch_proc = bspwm.subscribe(events)
+            fd = proc.stdout.fileno()
+            # Read whatever has arrived rather than line by line: a burst of
+            # events (e.g. a task switch moving every window) then costs one
+            # invalidation and one page refresh
+            while os.read(fd, 65536):
+                self._invalidate_window_counts()
+        except Exception as e:
+            print(f"[picker] Window watch failed: {e}", file=sys.stderr)
+
+        # Without events the cache can't be trusted; query every time
+        self._watching = False
+        self._invalidate_window_counts()
+
+    def stop_window_watch(self):
+        """Terminate the bspwm subscription started by start_window_watch()."""
+        proc, self._watch_proc = self._watch_proc, None
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    def _invalidate_window_counts(self):
+        """Drop cached window counts."""
+        with self._counts_lock:
+            self._window_counts = None
+            self._counts_gen += 1
+        if self.on_change:
+            self.on_change()
+
 
 class TaskPicker:
     """Task picker window using pywebview."""
@@ -185,6 +372,10 @@ class TaskPicker:
         self.token = token
         self.api = PickerAPI(token)
         self.window = None
+        # Refresh pushes come from both watcher threads; see _notify_changed
+        self._notify_lock = threading.Lock()
+        self._notifying = False
+        self._notify_again = False
 
     def run(self):
         """Start the picker."""
@@ -194,68 +385,144 @@ class TaskPicker:
             print("[picker] ERROR: pywebview not installed. Run: pip install pywebview", file=sys.stderr)
             sys.exit(1)
 
-        # Get HTML file path
-        ui_dir = Path(__file__).parent / 'ui'
-        html_file = ui_dir / 'index.html'
-
-        if not html_file.exists():
-            print(f"[picker] ERROR: UI file not found: {html_file}", file=sys.stderr)
+        # Read HTML content directly; a missing file shows up as the read
+        # failing, so there's no separate exists() check
+        try:
+            html_content = HTML_FILE.read_text()
+        except OSError as e:
+            print(f"[picker] ERROR: UI file not readable: {HTML_FILE}: {e}", file=sys.stderr)
             sys.exit(1)
 
-        # Read HTML content directly
-        html_content = html_file.read_text()
+        # Window counts are refreshed on bspwm events instead of per poll,
+        # and with inotify state changes are pushed to the page as well
+        self.api.start_window_watch()
+        self.api.live_updates = self._start_state_watch()
+        self.api.on_change = self._notify_changed
 
         # Create window with API using HTML string
         self.window = webview.create_window(
-            'taskwm - Tasks',
+            WINDOW_TITLE,
             html=html_content,
             js_api=self.api,
-            width=600,
-            height=500,
-            resizable=True,
-            text_select=False,
+            **WINDOW_OPTIONS,
         )
 
-        # Position window on tasks desktop after it's shown
-        def on_shown():
-            self._position_window()
-
-        self.window.events.shown += on_shown
+        # Position window on tasks desktop after it's shown. pywebview runs
+        # event handlers on their own thread, so the lookup retries in
+        # _position_window don't hold up the UI
+        self.window.events.shown += self._position_window
 
         # Start webview (blocking)
         webview.start()
 
-    def _position_window(self):
-        """Position window on tasks desktop."""
+        # The window is gone; don't leave the bspwm subscription open until
+        # its next event arrives
+        self.api.stop_window_watch()
+
+    def _start_state_watch(self) -> bool:
+        """Watch the state files with inotify. Returns False if unavailable."""
         try:
-            import subprocess
+            import inotify_simple
+        except ImportError:
+            return False
 
-            # Find our window by title
-            result = subprocess.run(
-                ['xdotool', 'search', '--name', 'taskwm - Tasks'],
-                capture_output=True, text=True, timeout=2
-            )
+        st = state.get_state()
+        flags = inotify_simple.flags
+        try:
+            inotify = inotify_simple.INotify()
+            st.state_file.parent.mkdir(parents=True, exist_ok=True)
+            # MODIFY catches journal appends from writers that keep their
+            # handle open (State reuses one across flushes), which never
+            # produce CLOSE_WRITE
+            inotify.add_watch(st.state_file.parent,
+                              flags.MODIFY | flags.CLOSE_WRITE | flags.MOVED_TO)
+        except OSError as e:
+            print(f"[picker] Could not watch state: {e}", file=sys.stderr)
+            return False
 
-            if result.returncode == 0 and result.stdout.strip():
-                dec_id = int(result.stdout.strip().split('\n')[0])
-                window_id = hex(dec_id)
+        names = {st.state_file.name, st.journal_file.name}
+        threading.Thread(target=self._watch_state, args=(inotify, names), daemon=True).start()
+        return True
+
+    def _watch_state(self, inotify, names: set):
+        """Push a refresh to the page whenever the state files change."""
+        while True:
+            events = inotify.read()  # Blocks; returns everything queued
+            if any(event.name in names for event in events):
+                self._notify_changed()
+
+    def _notify_changed(self):
+        """Ask the page to refresh now.
+
+        evaluate_js() blocks until the page has run the script, so changes
+        arriving meanwhile are folded into one more push instead of each
+        queueing their own.
+        """
+        if self.window is None:
+            return
+        with self._notify_lock:
+            if self._notifying:
+                self._notify_again = True
+                return
+            self._notifying = True
+
+        while True:
+            try:
+                self.window.evaluate_js(CHANGED_JS)
+            except Exception:
+                pass  # Window not ready or already closed; polling catches up
+            with self._notify_lock:
+                if not self._notify_again:
+                    self._notifying = False
+                    return
+                self._notify_again = False
 
-                # Move to tasks desktop and tile
-                bspwm.move_window(window_id, TASKS_DESKTOP)
-                bspwm.set_window_state(window_id, 'tiled')
+    def _position_window(self):
+        """Position window on tasks desktop."""
+        try:
+            # 'shown' can fire before bspwm manages the window, so retry with
+            # a short backoff instead of giving up after one lookup
+            delay = 0.005
+            for attempt in range(POSITION_ATTEMPTS):
+                if attempt:
+                    time.sleep(delay)
+                    delay *= 2
+                # Find our window by title. Matching our PID as well means
+                # another window with the same title can't be picked up.
+                # Goes through python-xlib when it's installed instead of
+                # forking xdotool
+                window_id = bspwm.find_window_by_name(WINDOW_TITLE, pid=os.getpid())
+                if window_id:
+                    # Move to tasks desktop and tile
+                    bspwm.place_window(window_id, TASKS_DESKTOP, 'tiled')
+                    return
+            print("[picker] Could not position window: window not found", file=sys.stderr)
         except Exception as e:
             print(f"[picker] Could not position window: {e}", file=sys.stderr)
 
 
+def _preimport_webview():
+    """Import pywebview ahead of TaskPicker.run() (errors are reported there)."""
+    try:
+        import webview  # noqa: F401
+    except ImportError:
+        pass
+
+
 def run_picker():
     """Entry point for picker UI."""
+    # pywebview is slow to import; overlap it with reading the token and
+    # loading config and state. run()'s own import then waits for this one
+    threading.Thread(target=_preimport_webview, daemon=True).start()
+
     # Read token from file
     token = ''
-    if TOKEN_FILE.exists():
-        try:
-            token = TOKEN_FILE.read_text().strip()
-        except Exception as e:
-            print(f"[picker] WARNING: Could not read token file: {e}", file=sys.stderr)
+    try:
+        token = TOKEN_FILE.read_text().strip()
+    except FileNotFoundError:
+        pass  # Reported as dev mode below
+    except Exception as e:
+        print(f"[picker] WARNING: Could not read token file: {e}", file=sys.stderr)
 
     if not token:
         print("[picker] WARNING: No token found, running in dev mode", file=sys.stderr)
@@ -0,0 +1,122 @@
+"""Tests for taskwm.state."""
+
+from taskwm.state import State
+
+
+def _pair(tmp_path):
+    """Two State instances on the same files, like the picker and the CLI."""
+    path = tmp_path / "state.json"
+    return State(path), State(path)
+
+
+def test_concurrent_add_task_ids_are_unique(tmp_path):
+    a, b = _pair(tmp_path)
+    a.load()
+    b.load()
+
+    ids = []
+    for i in range(5):
+        ids.append(a.add_task(f"a{i}"))
+        ids.append(b.add_task(f"b{i}"))
+
+    assert len(set(ids)) == len(ids)
+    fresh = State(tmp_path / "state.json")
+    assert [t["id"] for t in fresh.list_tasks()] == ids
+    assert [t["title"] for t in fresh.list_tasks()] == [f"{w}{i}" for i in range(5) for w in "ab"]
+
+
+def test_concurrent_add_category_ids_are_unique(tmp_path):
+    a, b = _pair(tmp_path)
+    a.load()
+    b.load()
+
+    ids = [a.add_category("one", "#111"), b.add_category("two", "#222")]
+
+    assert ids == [1, 2]
+    assert [c["id"] for c in State(tmp_path / "state.json").get_categories()] == ids
+
+
+def test_concurrent_writes_survive_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr("taskwm.state.JOURNAL_COMPACT_SIZE", 256)
+    a, b = _pair(tmp_path)
+
+    ids = []
+    for i in range(10):
+        ids.append(a.add_task(f"a{i}"))
+        ids.append(b.add_task(f"b{i}"))
+        b.rename_task(ids[-2], f"a{i}!")
+
+    assert ids == list(range(1, 21))
+    tasks = State(tmp_path / "state.json").list_tasks()
+    assert [t["id"] for t in tasks] == ids
+    assert all(t["title"].endswith("!") for t in tasks[::2])
+
+
+def test_noop_check_sees_other_writers(tmp_path):
+    picker, cli = _pair(tmp_path)
+    x = picker.add_task("x")
+    y = picker.add_task("y")
+    picker.set_current_task_id(x)
+
+    cli.set_current_task_id(y)
+    picker.set_current_task_id(x)  # Looks like a no-op to the stale picker
+
+    assert State(tmp_path / "state.json").get_current_task_id() == x
+
+
+def test_reorder_sees_other_writers(tmp_path):
+    picker, cli = _pair(tmp_path)
+    ids = [picker.add_task(t) for t in "abc"]
+
+    cli.reorder_task(ids[0], 2)
+    picker.reorder_task(ids[0], 0)  # Already first in the stale picker's copy
+
+    assert [t["id"] for t in State(tmp_path / "state.json").list_tasks()] == ids
+
+
+def test_status_file_follows_last_writer(tmp_path):
+    path, status = tmp_path / "state.json", tmp_path / "status"
+    picker, cli = State(path, status_file=status), State(path, status_file=status)
+    a = picker.add_task("A")
+    b = picker.add_task("B")
+
+    picker.set_current_task_id(a)
+    assert status.read_text() == "A"
+    cli.set_current_task_id(b)
+    assert status.read_text() == "B"
+    picker.set_current_task_id(a)
+    assert status.read_text() == "A"
+    cli.rename_task(a, "A2")
+    assert status.read_text() == "A2"
+
+
+class _Crash(Exception):
+    pass
+
+
+def _crash_before_truncate(self, journal):
+    raise _Crash
+
+
+def test_compaction_crash_before_truncate(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    st = State(path)
+    a = st.add_task("a")
+    b = st.add_task("b")
+    st.move_task_up(b)
+
+    with monkeypatch.context() as m:
+        m.setattr(State, "_reset_journal", _crash_before_truncate)
+        try:
+            st.compact()
+        except _Crash:
+            pass
+
+    assert [(t["id"], t["title"]) for t in State(path).list_tasks()] == [(b, "b"), (a, "a")]
+
+    # The next writer finishes the compaction instead of appending to the
+    # already-folded journal
+    c = State(path).add_task("c")
+    assert [t["id"] for t in State(path).list_tasks()] == [b, a, c]
+    st.reload()
+    assert [t["id"] for t in st.list_tasks()] == [b, a, c]